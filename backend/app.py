@@ -1,9 +1,17 @@
-import sys, os
+import sys, os, uuid
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from routes.interview_route import router as interview_router
 from routes.auth_routes import router as auth_router
+from routes.admin_routes import router as admin_router
+from routes.analytics_routes import router as analytics_router
+from chatbot.components.readiness.readiness import readiness
+from chatbot.components.code_runner.code_runner import code_runner
+from chatbot.components.resume.resume_parser import resume_parser
+from database.turn_writer import turn_writer
+from chatbot.components.src_logging.logger import bind_context
 
 app = FastAPI(title = "AI Interviewer API")
 
@@ -15,13 +23,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    # Every log line written while handling this request carries its id
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    bind_context(request_id=request_id)
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 # Register the routes
 app.include_router(interview_router)
 app.include_router(auth_router)
+app.include_router(admin_router)
+app.include_router(analytics_router)
+
+@app.on_event("startup")
+def warm_up():
+    # Models, question bank and clients load in the background, /health/ready reports progress
+    readiness.start_background_warm_up()
+    # Sandbox workers for coding answers are started ahead of the first submission
+    code_runner.start()
+    # Before requests arrive, so the pool is never created from a request thread
+    resume_parser.start()
+
+@app.on_event("shutdown")
+def shut_down():
+    code_runner.close()
+    resume_parser.close()
+    # Write the transcript turns still queued
+    turn_writer.close()
 
 @app.get("/")
 def health():
     return {"status": "active", "service":"Authentication Service"}
 
+@app.get("/health/live")
+def liveness():
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+def readiness_check():
+    report = readiness.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+Measures the logging cost paid on the request thread per /chat turn, comparing the
+old synchronous FileHandler setup with the queue based JSON logger.
+
+    python -m benchmarks.log_overhead --turns 2000
+"""
+import os, time, logging, argparse, tempfile
+import numpy as np
+
+# Roughly the log calls made while serving one /chat turn
+LOGS_PER_TURN = 6
+# Stand-in for the LLM / retrieval wait between turns (a real turn waits seconds)
+TURN_GAP_S = 0.002
+
+def run(logger, turns, gap_s=TURN_GAP_S):
+    per_turn = []
+    for turn in range(turns):
+        start = time.perf_counter()
+        for i in range(LOGS_PER_TURN):
+            logger.info(f"turn {turn} step {i}: retrieved question for topic Statistics")
+        per_turn.append((time.perf_counter() - start) * 1e6)
+        time.sleep(gap_s)
+    return np.asarray(per_turn)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--burst", action="store_true", help="no gap between turns (worst case for the writer thread)")
+    args = parser.parse_args()
+    gap_s = 0 if args.burst else TURN_GAP_S
+
+    tmp = tempfile.mkdtemp()
+    os.environ["LOG_DIR"] = tmp
+    from chatbot.components.src_logging.logger import queue_handler
+
+    before = logging.getLogger("bench.before")
+    before.propagate = False
+    sync_handler = logging.FileHandler(os.path.join(tmp, "before.log"))
+    sync_handler.setFormatter(logging.Formatter("[%(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s"))
+    before.addHandler(sync_handler)
+
+    after = logging.getLogger("bench.after")
+    after.propagate = False
+    after.addHandler(queue_handler)
+
+    print(f"{'setup':<24} {'mean us/turn':>12} {'p99 us/turn':>12}")
+    for name, logger in (("sync FileHandler", before), ("queue + JSON (after)", after)):
+        timings = run(logger, args.turns, gap_s)
+        print(f"{name:<24} {timings.mean():>12.1f} {np.percentile(timings, 99):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
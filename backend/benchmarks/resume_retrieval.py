@@ -0,0 +1,109 @@
+"""
+Measures per-turn retrieval latency before and after resume-conditioned retrieval.
+Before, every turn embedded the topic query. After, the topic vector comes from a
+process-wide cache and is blended with the resume vector embedded once at /start.
+
+    python -m benchmarks.resume_retrieval --turns 500
+    python -m benchmarks.resume_retrieval --fake-encoder   # without the embedding model
+"""
+import os, time, zlib, random, argparse, tempfile
+import numpy as np
+
+DIM = 768
+RESUME = """Data Scientist, 3 years.
+Built gradient boosted churn models in Python (XGBoost, scikit-learn) and served them behind FastAPI.
+Wrote SQL pipelines on Postgres and BigQuery, window functions and query tuning.
+Ran A/B tests and reported confidence intervals to product teams.
+Projects: fraud detection with isolation forests, demand forecasting with Prophet."""
+
+class FakeEncoder:
+    """
+    Deterministic vectors per text, for environments without the model. Has no
+    latency of its own, so it only shows the search side of a turn.
+    """
+    def embed_query(self, text):
+        return np.random.default_rng(zlib.crc32(text.encode())).standard_normal(DIM).tolist()
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+class CountingEncoder:
+    def __init__(self, encoder):
+        self.encoder = encoder
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return self.encoder.embed_query(text)
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return self.encoder.embed_documents(texts)
+
+def synthetic_snapshot(encoder, size):
+    from chatbot.components.rag_implementation.snapshot import write_snapshot, QuestionBankSnapshot
+    from chatbot.components.rag_implementation.topics import TOPIC_NAMES
+
+    # Questions scattered around their topic's query vector
+    rng = np.random.default_rng(0)
+    centroids = np.asarray(encoder.embed_documents(TOPIC_NAMES), dtype=np.float32)
+    topics = rng.integers(0, len(TOPIC_NAMES), size)
+    vectors = centroids[topics] + 0.9 * rng.standard_normal((size, centroids.shape[1])).astype(np.float32)
+    records = [
+        {"text": f"question {i}", "metadata": {"answer": f"answer {i}", "source": "synthetic", "topic": TOPIC_NAMES[t]}}
+        for i, t in enumerate(topics)
+    ]
+    root = tempfile.mkdtemp()
+    version = write_snapshot(records, vectors, [str(i) for i in range(size)], root=root)
+    return QuestionBankSnapshot(os.path.join(root, version))
+
+def run_turns(turns, snapshot, make_vector, resume_vector):
+    from chatbot.components.rag_implementation.rag_engine import QUERY_VARIATIONS
+    from chatbot.components.rag_implementation.topics import TOPIC_NAMES
+
+    rng = random.Random(1)
+    timings, resume_similarity = [], []
+    for turn in range(turns):
+        topic = TOPIC_NAMES[turn % len(TOPIC_NAMES)]
+        query = f"{topic} {rng.choice(QUERY_VARIATIONS)}"
+        start = time.perf_counter()
+        results = snapshot.search(make_vector(query), k=7, topic=topic)
+        timings.append((time.perf_counter() - start) * 1000)
+        rows = [row for row, _ in results]
+        resume_similarity.append(float(np.mean(np.asarray(snapshot.embeddings[rows]) @ resume_vector)))
+    return np.asarray(timings), float(np.mean(resume_similarity))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--size", type=int, default=20000, help="questions in the synthetic snapshot")
+    parser.add_argument("--fake-encoder", action="store_true")
+    args = parser.parse_args()
+
+    from chatbot.components.rag_implementation import rag_engine
+    from chatbot.components.rag_implementation.encoder import get_query_encoder
+
+    encoder = CountingEncoder(FakeEncoder() if args.fake_encoder else get_query_encoder())
+    snapshot = synthetic_snapshot(encoder, args.size)
+    rag_engine.warm_query_vectors(encoder)
+
+    start = time.perf_counter()
+    resume_vector = rag_engine.embed_resume(encoder, RESUME)
+    print(f"resume embedded once at /start in {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+    setups = (
+        ("before: embed topic query", lambda q: encoder.embed_query(q)),
+        ("after: cached topic only", lambda q: rag_engine.query_vector(encoder, q)),
+        ("after: topic + resume", lambda q: rag_engine.blend_query(rag_engine.query_vector(encoder, q), resume_vector)),
+    )
+    print(f"{'setup':<28} {'p50 ms':>8} {'p95 ms':>8} {'embeds/turn':>12} {'resume sim':>11}")
+    for name, make_vector in setups:
+        calls = encoder.calls
+        timings, similarity = run_turns(args.turns, snapshot, make_vector, resume_vector)
+        per_turn = (encoder.calls - calls) / args.turns
+        print(f"{name:<28} {np.percentile(timings, 50):>8.2f} {np.percentile(timings, 95):>8.2f} "
+              f"{per_turn:>12.2f} {similarity:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Replays interview sessions through InterviewLoop and InterviewJudge against pluggable
+backends and reports per-stage latency, prompt tokens per turn, and retrieval
+recall@k and diversity. Results are diffed against a stored baseline and the run
+fails (exit code 1) when a hot path regressed.
+
+    python -m benchmarks.session_replay                            # offline fakes, synthetic sessions
+    python -m benchmarks.session_replay --save-baseline            # record the baseline to compare against
+    python -m benchmarks.session_replay --store snapshot --llm hf  # latest snapshot and the real LLM
+    python -m benchmarks.session_replay --sessions export.ndjson   # sessions exported with include_text
+
+Backends:
+    --llm fake|hf                  canned interviewer / judge replies, or the HuggingFace endpoint
+    --store fake|snapshot|pinecone synthetic snapshot with a hashed encoder, the latest question bank
+                                   snapshot, or the Pinecone index (no recall@k, nothing to compare to)
+"""
+import os, re, sys, json, time, random, argparse, tempfile
+from collections import defaultdict
+import numpy as np
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "sessions.json")
+BASELINE_DIR = os.path.join("artifacts", "benchmarks")
+
+# Allowed drift before a metric counts as a regression
+LATENCY_TOLERANCE = 0.25  # relative
+LATENCY_SLACK_MS = 1.0    # absolute, keeps sub-millisecond stages from flapping
+TOKEN_TOLERANCE = 0.05    # relative
+QUALITY_TOLERANCE = 0.02  # absolute, recall and diversity
+
+RETRIEVED = re.compile(r'retrieved text: "(.*?)"', re.S)
+
+def load_sessions(path):
+    """
+    A JSON list of {role, resume_text, messages} fixtures, or an NDJSON export
+    written with include_text (candidate turns are replayed).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".ndjson"):
+            sessions = []
+            for line in f:
+                record = json.loads(line)
+                messages = [t["content"] for t in record.get("transcript", []) if t["speaker"] == "candidate"]
+                if messages:
+                    sessions.append({"role": record["job_role"], "resume_text": record.get("resume_text"),
+                                     "messages": messages})
+            return sessions
+        return json.load(f)
+
+class StageTimer:
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.samples[stage].append((time.perf_counter() - start) * 1000)
+        return timed
+
+def prompt_tokens(prompt) -> int:
+    # Same ~4 chars per token estimate the LLM scheduler uses
+    if hasattr(prompt, "to_string"):
+        return len(prompt.to_string()) // 4
+    return sum(len(m.content) for m in prompt) // 4
+
+# LLM backends
+
+def fake_interviewer(latency_ms):
+    from langchain_core.messages import AIMessage, SystemMessage
+
+    def reply(messages):
+        time.sleep(latency_ms / 1000)
+        instructions = [m.content for m in messages if isinstance(m, SystemMessage)]
+        found = RETRIEVED.search(instructions[-1]) if len(instructions) > 1 else None
+        if found:
+            return AIMessage(content=f"Thanks. Next question: {found.group(1)}")
+        return AIMessage(content="Can you walk me through that in more detail?")
+    return reply
+
+def fake_judge(latency_ms):
+    from langchain_core.messages import AIMessage
+
+    def reply(prompt):
+        time.sleep(latency_ms / 1000)
+        return AIMessage(content=json.dumps({
+            "verdict": "Pass", "score": 70, "summary": "Replayed session.",
+            "strong_areas": [], "weak_areas": [], "improvements": []
+        }))
+    return reply
+
+class TimedModel:
+    """
+    Interviewer model proxy recording latency and prompt tokens of every call.
+    """
+    def __init__(self, invoke, timer, tokens):
+        self._invoke = timer.wrap("llm", invoke)
+        self._tokens = tokens
+
+    def invoke(self, messages):
+        self._tokens.append(prompt_tokens(messages))
+        return self._invoke(messages)
+
+def build_llms(kind, latency_ms, timer, tokens, judge_tokens):
+    from langchain_core.runnables import RunnableLambda
+
+    if kind == "hf":
+        from chatbot.components.llm.llm_client import build_chat_model
+        interviewer, judge = build_chat_model(temperature=0.4).invoke, build_chat_model(temperature=0.4).invoke
+    else:
+        interviewer, judge = fake_interviewer(latency_ms), fake_judge(latency_ms)
+
+    def judged(prompt):
+        judge_tokens.append(prompt_tokens(prompt))
+        return judge(prompt)
+    return TimedModel(interviewer, timer, tokens), RunnableLambda(judged)
+
+# Vector store backends
+
+class RecordingSnapshot:
+    """
+    Snapshot proxy recording every search and every selected row for recall and diversity.
+    """
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.searches = []
+        self.selected = []
+
+    def __getattr__(self, name):
+        return getattr(self.snapshot, name)
+
+    def __len__(self):
+        # Dunders are looked up on the class, __getattr__ never sees them
+        return len(self.snapshot)
+
+    def search(self, query_vector, k=7, topic=None):
+        results = self.snapshot.search(query_vector, k=k, topic=topic)
+        self.searches.append((np.asarray(query_vector, dtype=np.float32), topic, [row for row, _ in results], k))
+        return results
+
+    def get(self, row):
+        self.selected.append(row)
+        return self.snapshot.get(row)
+
+class StaticSnapshots:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def current(self):
+        return self.snapshot
+
+class NullIndex:
+    # Remote index stand-in for offline runs, every query comes back empty
+    class _Result:
+        matches = []
+
+    def query(self, **kwargs):
+        return self._Result()
+
+def build_store(kind, size):
+    """
+    Returns a factory of RagEngines sharing one backend, plus the recording snapshot (if any).
+    """
+    from chatbot.components.rag_implementation.rag_engine import RagEngine, warm_query_vectors
+    from chatbot.components.rag_implementation.answer_store import AnswerStore
+
+    if kind == "pinecone":
+        engine = RagEngine(snapshots=StaticSnapshots(None))
+        warm_query_vectors(engine.embeddings)
+        return lambda: RagEngine(index=engine.index, snapshots=engine.snapshots, encoder=engine.embeddings,
+                                 answer_store=engine.answer_store), None
+
+    if kind == "fake":
+        from benchmarks.resume_retrieval import FakeEncoder, synthetic_snapshot
+        encoder = FakeEncoder()
+        snapshot = synthetic_snapshot(encoder, size)
+    else:
+        from chatbot.components.rag_implementation.encoder import get_query_encoder
+        from chatbot.components.rag_implementation.snapshot import SnapshotManager
+        encoder = get_query_encoder()
+        snapshot = SnapshotManager().load_latest()
+        if snapshot is None:
+            sys.exit("No question bank snapshot found, run the ingestion first or use --store fake")
+
+    recording = RecordingSnapshot(snapshot)
+    snapshots = StaticSnapshots(recording)
+    answer_store = AnswerStore(os.path.join(tempfile.mkdtemp(), "answers.db"))
+    warm_query_vectors(encoder)
+    return lambda: RagEngine(index=NullIndex(), snapshots=snapshots, encoder=encoder, answer_store=answer_store), recording
+
+# Replay
+
+def replay(sessions, make_rag, interviewer, judge_llm, timer, seed, recording=None):
+    from chatbot.components.bot_flow.bot_logic import InterviewLoop
+    from chatbot.components.judge.judge_logic import InterviewJudge
+
+    replayed = []
+    for i, session in enumerate(sessions):
+        random.seed(seed + i)
+        start = time.perf_counter()
+        rag = make_rag()
+        rag.get_interview_question = timer.wrap("retrieval", rag.get_interview_question)
+        bot = InterviewLoop(session["role"], session.get("resume_text") or None, model=interviewer, rag=rag)
+        timer.samples["start"].append((time.perf_counter() - start) * 1000)
+        bot.answer_scorer.score_reply = timer.wrap("scoring", bot.answer_scorer.score_reply)
+        bot.answer_scorer.question_offered = timer.wrap("scoring", bot.answer_scorer.question_offered)
+
+        first_row = len(recording.selected) if recording else 0
+        process_turn = timer.wrap("turn", bot.process_turn)
+        for message in session["messages"]:
+            process_turn(message)
+
+        judge = InterviewJudge(llm=judge_llm)
+        timer.wrap("judge", judge.evaluate_interview)(bot.get_transcript_str(condense_scored=True), bot.answer_scorer.table())
+        rows = recording.selected[first_row:] if recording else []
+        replayed.append((bot.coverage, rows))
+    return replayed
+
+def retrieval_quality(recording, replayed):
+    if recording is None or not recording.searches:
+        return {}
+
+    recalls = []
+    for query, topic, rows, k in recording.searches:
+        # Same candidates as Snapshot.search, an untagged snapshot scans every row
+        candidates = recording.partitions.get(topic) if topic else None
+        if candidates is None:
+            candidates = np.arange(len(recording))
+        if not len(candidates):
+            continue
+        exact_scores = np.asarray(recording.embeddings[candidates]) @ (query / (np.linalg.norm(query) + 1e-12))
+        exact = set(candidates[np.argsort(-exact_scores)[:k]].tolist())
+        recalls.append(len(exact & set(rows)) / min(k, len(candidates)))
+
+    distinct, distances = [], []
+    for _, rows in replayed:
+        if not rows:
+            continue
+        distinct.append(len(set(rows)) / len(rows))
+        if len(rows) > 1:
+            vectors = np.asarray(recording.embeddings[rows])
+            similarity = vectors @ vectors.T
+            upper = np.triu_indices(len(rows), k=1)
+            distances.append(float(np.mean(1 - similarity[upper])))
+
+    return {
+        "retrieval.recall_at_k": float(np.mean(recalls)) if recalls else None,
+        "retrieval.distinct_ratio": float(np.mean(distinct)) if distinct else None,
+        "retrieval.mean_pairwise_distance": float(np.mean(distances)) if distances else None,
+        "retrieval.topics_per_session": float(np.mean([sum(1 for c in cov.counts.values() if c) for cov, _ in replayed]))
+                                        if replayed else None,
+    }
+
+def collect_metrics(timer, tokens, judge_tokens, quality):
+    metrics = {}
+    for stage in ("start", "retrieval", "llm", "scoring", "turn", "judge"):
+        samples = timer.samples.get(stage)
+        if samples:
+            metrics[f"latency.{stage}_ms.p50"] = float(np.percentile(samples, 50))
+            metrics[f"latency.{stage}_ms.p95"] = float(np.percentile(samples, 95))
+    if tokens:
+        metrics["tokens.prompt_per_turn.mean"] = float(np.mean(tokens))
+        metrics["tokens.prompt_per_turn.max"] = float(np.max(tokens))
+    if judge_tokens:
+        metrics["tokens.judge_prompt.mean"] = float(np.mean(judge_tokens))
+    metrics.update({k: v for k, v in quality.items() if v is not None})
+    return metrics
+
+def is_regression(name, baseline, current):
+    if name.startswith("latency."):
+        return current > baseline * (1 + LATENCY_TOLERANCE) + LATENCY_SLACK_MS
+    if name.startswith("tokens."):
+        return current > baseline * (1 + TOKEN_TOLERANCE)
+    return current < baseline - QUALITY_TOLERANCE
+
+def compare(baseline, metrics):
+    regressions = []
+    print(f"{'metric':<38} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name in sorted(set(baseline) | set(metrics)):
+        # Missing on one side, or None when a run had nothing to measure
+        if baseline.get(name) is None or metrics.get(name) is None:
+            print(f"{name:<38} {str(baseline.get(name, '-')):>10} {str(metrics.get(name, '-')):>10}")
+            continue
+        before, now = baseline[name], metrics[name]
+        change = f"{(now - before) / before * 100:+.0f}%" if before else "n/a"
+        flag = ""
+        if is_regression(name, before, now):
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<38} {before:>10.3f} {now:>10.3f} {change:>8}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", default=FIXTURES, help="fixture JSON or an export NDJSON with transcripts")
+    parser.add_argument("--llm", choices=["fake", "hf"], default="fake")
+    parser.add_argument("--store", choices=["fake", "snapshot", "pinecone"], default="fake")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="simulated latency of the fake LLM")
+    parser.add_argument("--size", type=int, default=20000, help="questions in the fake store")
+    parser.add_argument("--repeat", type=int, default=3, help="replay every session this many times")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", help="baseline file, default artifacts/benchmarks/session_replay.<llm>-<store>.json")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+
+    sessions = load_sessions(args.sessions) * args.repeat
+    timer, tokens, judge_tokens = StageTimer(), [], []
+    interviewer, judge_llm = build_llms(args.llm, args.llm_latency_ms, timer, tokens, judge_tokens)
+    make_rag, recording = build_store(args.store, args.size)
+
+    replayed = replay(sessions, make_rag, interviewer, judge_llm, timer, args.seed, recording)
+    metrics = collect_metrics(timer, tokens, judge_tokens, retrieval_quality(recording, replayed))
+    print(f"Replayed {len(sessions)} sessions, {sum(len(s['messages']) for s in sessions)} turns "
+          f"(llm={args.llm}, store={args.store})\n")
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"session_replay.{args.llm}-{args.store}.json")
+    if args.save_baseline or not os.path.exists(baseline_path):
+        os.makedirs(os.path.dirname(baseline_path) or ".", exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(metrics, f, indent=2, sort_keys=True)
+        for name, value in sorted(metrics.items()):
+            print(f"{name:<38} {value:>10.3f}")
+        print(f"\nSaved baseline to {baseline_path}")
+        return
+
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, metrics)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {baseline_path}: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\nNo regressions against {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
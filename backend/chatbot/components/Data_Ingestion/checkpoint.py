@@ -0,0 +1,98 @@
+import os, json, shutil
+import numpy as np
+from typing import List, Dict
+
+from chatbot.components.src_logging.logger import logging
+
+CHECKPOINT_DIR = os.getenv("INGESTION_CHECKPOINT_DIR", os.path.join("artifacts", "ingestion"))
+
+class IngestionCheckpoint:
+    """
+    Persists the progress of an ingestion run so a failed run can be resumed
+    with --resume instead of re-scraping and re-embedding everything.
+
+    Layout of the checkpoint directory:
+        stages/<name>.json          output of a completed stage (scraped / deduped records)
+        embeddings/<offset>.npy     embedded vectors of one batch
+        state.json                  upserted batch offsets and the retry queue
+    """
+    def __init__(self, root: str = CHECKPOINT_DIR):
+        self.root = root
+        self.stage_dir = os.path.join(root, "stages")
+        self.embedding_dir = os.path.join(root, "embeddings")
+        self.state_path = os.path.join(root, "state.json")
+
+        os.makedirs(self.stage_dir, exist_ok=True)
+        os.makedirs(self.embedding_dir, exist_ok=True)
+        self.state = self._load_state()
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        return {"upserted": [], "failed": {}}
+
+    @staticmethod
+    def _atomic_write(path, write_fn, mode="w"):
+        # Write to a temp file first so a crash never leaves a half written checkpoint
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, mode) as f:
+            write_fn(f)
+        os.replace(tmp_path, path)
+
+    def _save_state(self):
+        self._atomic_write(self.state_path, lambda f: json.dump(self.state, f))
+
+    def reset(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.__init__(self.root)
+        logging.info(f"Ingestion checkpoint reset at {self.root}")
+
+    # Stages
+    def _stage_path(self, name):
+        return os.path.join(self.stage_dir, f"{name}.json")
+
+    def has_stage(self, name: str) -> bool:
+        return os.path.exists(self._stage_path(name))
+
+    def save_stage(self, name: str, records: List[Dict]):
+        self._atomic_write(self._stage_path(name), lambda f: json.dump(records, f))
+        logging.info(f"Checkpointed stage '{name}' ({len(records)} records)")
+
+    def load_stage(self, name: str) -> List[Dict]:
+        with open(self._stage_path(name), "r") as f:
+            return json.load(f)
+
+    # Embedded batches
+    def _embedding_path(self, offset):
+        return os.path.join(self.embedding_dir, f"{offset}.npy")
+
+    def has_embeddings(self, offset: int) -> bool:
+        return os.path.exists(self._embedding_path(offset))
+
+    def save_embeddings(self, offset: int, vectors):
+        self._atomic_write(
+            self._embedding_path(offset),
+            lambda f: np.save(f, np.asarray(vectors, dtype=np.float32)),
+            mode="wb"
+        )
+
+    def load_embeddings(self, offset: int) -> np.ndarray:
+        return np.load(self._embedding_path(offset))
+
+    # Upserted batches and retry queue
+    def is_upserted(self, offset: int) -> bool:
+        return offset in self.state["upserted"]
+
+    def mark_upserted(self, offset: int):
+        if offset not in self.state["upserted"]:
+            self.state["upserted"].append(offset)
+        self.state["failed"].pop(str(offset), None)
+        self._save_state()
+
+    def mark_failed(self, offset: int, error: Exception):
+        self.state["failed"][str(offset)] = str(error)
+        self._save_state()
+
+    def retry_queue(self) -> List[int]:
+        return sorted(int(offset) for offset in self.state["failed"])
@@ -1,12 +1,17 @@
-import os, time, requests, re, sys
+import os, time, requests, re, sys, argparse, hashlib
+import numpy as np
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from pinecone import Pinecone, ServerlessSpec
 from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_pinecone import PineconeVectorStore
 from datasets import load_dataset
 from chatbot.components.exception.exception import ChatbotException
 from chatbot.components.src_logging.logger import logging
+from chatbot.components.Data_Ingestion.dedup import MinHashDeduplicator
+from chatbot.components.Data_Ingestion.checkpoint import IngestionCheckpoint
+from chatbot.components.rag_implementation.snapshot import write_snapshot
+from chatbot.components.rag_implementation.answer_store import AnswerStore
+from chatbot.components.rag_implementation.topics import topic_centroids, assign_topics
 from abc import ABC, abstractmethod
 from typing import List, Dict
 
@@ -71,30 +76,71 @@ class GithubMdLoader(DataSourceLoader):
         return results
 
 class HuggingFaceLoader(DataSourceLoader):
-    def __init__(self, dataset_names: list):
+    """
+    Loads Q&A pairs from HuggingFace datasets. Column names are resolved once
+    per dataset and rows are read in columnar batches instead of one dict at a
+    time. Set streaming=True for datasets that don't fit in memory.
+    """
+    QUESTION_COLUMNS = ("Question", "question", "QUESTION")
+    ANSWER_COLUMNS = ("Answer", "answer", "ANSWER")
+
+    def __init__(self, dataset_names: list, streaming: bool = False, batch_size: int = 1000):
         self.dataset_names = dataset_names
+        self.streaming = streaming
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _resolve_column(columns, candidates):
+        for name in candidates:
+            if name in columns:
+                return name
+        return None
+
+    def iter_batches(self, name):
+        """
+        Yields lists of records, one list per batch of rows of the given dataset.
+        """
+        ds = load_dataset(name, split="train", streaming=self.streaming)
+        logging.info(f"Dataset {name} loaded (streaming={self.streaming})")
+
+        # Streaming datasets may not know their schema until the first row is read
+        columns = ds.column_names or list(next(iter(ds)).keys())
+        q_col = self._resolve_column(columns, self.QUESTION_COLUMNS)
+        a_col = self._resolve_column(columns, self.ANSWER_COLUMNS)
+        if not q_col or not a_col:
+            logging.warning(f"No question/answer columns in {name}, found: {columns}")
+            return
+
+        # Only decode the two columns we need
+        ds = ds.select_columns([q_col, a_col])
+
+        rows_seen = 0
+        for batch in ds.iter(batch_size=self.batch_size):
+            questions = batch[q_col]
+            answers = batch[a_col]
+            rows_seen += len(questions)
+
+            yield [
+                {
+                    "text": q,
+                    "metadata": {
+                        "source": name,
+                        "question": q,
+                        "answer": a
+                    }
+                }
+                for q, a in zip(questions, answers) if q and a
+            ]
+            logging.info(f"{name}: processed {rows_seen} rows")
 
     def load_data(self):
         results = []
 
         for name in self.dataset_names:
             try:
-               ds = load_dataset(name, split="train")
-               logging.info("Dataset loaded successfully")
-               for row in ds:
-                   q = row.get("Question") or row.get("question") or row.get("QUESTION")
-                   a = row.get("Answer") or row.get("answer") or row.get("ANSWER")
-                   if q and a:
-                       logging.info(f"Ques and ans found in the dataset")
-                       results.append({
-                           "text": q,
-                           "metadata":{
-                               "source": name,
-                               "question": q,
-                               "answer": a
-                           }
-                       })
-                       logging.info("Question-Answer pair added to the results")
+                for records in self.iter_batches(name):
+                    results.extend(records)
+                logging.info(f"{name}: {len(results)} question-answer pairs collected so far")
             except Exception as e:
                 raise ChatbotException(e, sys)
         return results
@@ -166,9 +212,50 @@ class AnalyticsVidhyaLoader(DataSourceLoader):
                 
         return results
 
-def main():
+def document_id(text: str) -> str:
+    """
+    Deterministic vector id, so re-upserting a batch on resume overwrites
+    instead of duplicating.
+    """
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+def upsert_batch(index, answer_store, checkpoint, offset, batch):
+    vectors = checkpoint.load_embeddings(offset)
+    ids = [document_id(item['text']) for item in batch]
+
+    # Question/answer text lives in the local answer store, the index only gets ids
+    # and small metadata so similarity searches don't ship k full answers back
+    answer_store.put_many([
+        {
+            "id": doc_id,
+            "question": item['text'],
+            "answer": item['metadata'].get("answer", ""),
+            "source": item['metadata'].get("source", "")
+        }
+        for doc_id, item in zip(ids, batch)
+    ])
+
+    index.upsert(vectors=[
+        {
+            "id": doc_id,
+            "values": [float(v) for v in vector],
+            "metadata": {
+                "source": item['metadata'].get("source", ""),
+                "sources": item['metadata'].get("sources", []),
+                "topic": item['metadata'].get("topic", "")
+            }
+        }
+        for doc_id, item, vector in zip(ids, batch, vectors)
+    ])
+    checkpoint.mark_upserted(offset)
+
+def main(resume: bool = False):
     try:
-        logging.info("Starting Data Ingestion Pipeline...")
+        logging.info(f"Starting Data Ingestion Pipeline (resume={resume})...")
+        checkpoint = IngestionCheckpoint()
+        if not resume:
+            checkpoint.reset()
+
         pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
 
         existing_indexes = [index.name for index in pc.list_indexes()]
@@ -190,53 +277,114 @@ def main():
             model_name="sentence-transformers/all-mpnet-base-v2",
         )
 
-        documents = []
-        metadata = []
-
-        loaders = [
-            HuggingFaceLoader([
-                "UdayG01/DataScienceInterviewQuestions", 
-                "manasuma/ml_interview_qa"
-            ]),
-            GithubMdLoader([
-                "https://github.com/youssefHosni/Data-Science-Interview-Questions-Answers/blob/main/SQL%20%26%20DB%20Interview%20Questions%20%26%20Answers%20for%20Data%20Scientists.md"
-            ]),
-            AnalyticsVidhyaLoader([
-                "https://www.analyticsvidhya.com/blog/2024/06/data-science-coding-questions/"
-            ])
-        ]
+        if checkpoint.has_stage("deduped"):
+            unique = checkpoint.load_stage("deduped")
+            logging.info(f"Resuming with {len(unique)} deduplicated questions from checkpoint")
+        else:
+            collected = []
 
-        for loader in loaders:
-            try:
-                raw_data = loader.load_data()
+            loaders = [
+                HuggingFaceLoader([
+                    "UdayG01/DataScienceInterviewQuestions", 
+                    "manasuma/ml_interview_qa"
+                ]),
+                GithubMdLoader([
+                    "https://github.com/youssefHosni/Data-Science-Interview-Questions-Answers/blob/main/SQL%20%26%20DB%20Interview%20Questions%20%26%20Answers%20for%20Data%20Scientists.md"
+                ]),
+                AnalyticsVidhyaLoader([
+                    "https://www.analyticsvidhya.com/blog/2024/06/data-science-coding-questions/"
+                ])
+            ]
 
-                for item in raw_data:
-                    documents.append(item['text'])
-                    metadata.append(item['metadata'])
-            except Exception as e:
-                logging.error(f"Error loading data with {type(loader).__name__}: {e}")
-            
-        if not documents:
-                logging.warning("No data collected from loaders.")
+            failed_loaders = []
+            for loader in loaders:
+                stage = type(loader).__name__
+                try:
+                    if checkpoint.has_stage(stage):
+                        raw_data = checkpoint.load_stage(stage)
+                        logging.info(f"Loaded {stage} output from checkpoint")
+                    else:
+                        raw_data = loader.load_data()
+                        checkpoint.save_stage(stage, raw_data)
+                    collected.extend(raw_data)
+                except Exception as e:
+                    logging.error(f"Error loading data with {stage}: {e}")
+                    failed_loaders.append(stage)
+
+            # Deduplicating a partial set would checkpoint it (and the batch offsets
+            # derived from it) for good. Stop here, a resume reruns only the failed loaders.
+            if failed_loaders:
+                logging.warning(f"Loaders {failed_loaders} failed, rerun with --resume to retry them")
                 return
-        logging.info(f"Total Questions Collected: {len(documents)}")
 
-        vector_store = PineconeVectorStore(
-            index_name=INDEX_NAME,
-            embedding=embeddings
-        )
+            if not collected:
+                    logging.warning("No data collected from loaders.")
+                    return
+            logging.info(f"Total Questions Collected: {len(collected)}")
+
+            # The sources overlap heavily, collapse paraphrases before they hit the index
+            unique = MinHashDeduplicator().deduplicate(collected)
+            # Batch offsets below are only stable if the deduplicated order is persisted
+            checkpoint.save_stage("deduped", unique)
 
         Batch = 100
-        for i in range(0, len(documents), Batch):
-            batch_docs = documents[i:i+Batch]
-            batch_metadata = metadata[i:i+Batch]
+        for i in range(0, len(unique), Batch):
+            if not checkpoint.has_embeddings(i):
+                batch = unique[i:i+Batch]
+                checkpoint.save_embeddings(i, embeddings.embed_documents([item['text'] for item in batch]))
+                logging.info(f"Embedded batch {i} - {i+len(batch)}")
+        vectors = np.vstack([checkpoint.load_embeddings(i) for i in range(0, len(unique), Batch)])
+
+        # Tag every question with its nearest topic centroid once, so retrieval can
+        # search a single topic partition instead of the whole index
+        centroids = topic_centroids(embeddings, refine_with=vectors)
+        for item, topic in zip(unique, assign_topics(vectors, centroids)):
+            item['metadata']['topic'] = topic
+
+        index = pc.Index(INDEX_NAME)
+        answer_store = AnswerStore()
+
+        for i in range(0, len(unique), Batch):
+            if checkpoint.is_upserted(i):
+                continue
+            batch = unique[i:i+Batch]
+
+            try:
+                upsert_batch(index, answer_store, checkpoint, i, batch)
+                logging.info(f"Inserted batch {i} - {i+len(batch)}")
+            except Exception as e:
+                # Don't abort the run, the batch goes to the retry queue
+                logging.error(f"Batch {i} - {i+len(batch)} failed, queued for retry: {e}")
+                checkpoint.mark_failed(i, e)
+
+        for i in checkpoint.retry_queue():
+            time.sleep(5)
+            try:
+                upsert_batch(index, answer_store, checkpoint, i, unique[i:i+Batch])
+                logging.info(f"Retried batch {i} successfully")
+            except Exception as e:
+                logging.error(f"Retry of batch {i} failed again: {e}")
+                checkpoint.mark_failed(i, e)
+
+        pending = checkpoint.retry_queue()
+        if pending:
+            logging.warning(f"Ingestion finished with {len(pending)} failed batches {pending}, rerun with --resume")
+            return
+
+        # Publish the embedded question bank as a local snapshot too
+        write_snapshot(
+            unique, vectors,
+            ids=[document_id(item['text']) for item in unique],
+            # Product quantization is only worth training for large corpora
+            pq_subspaces=int(os.getenv("SNAPSHOT_PQ_SUBSPACES", "0"))
+        )
 
-            vector_store.add_texts(texts=batch_docs, metadatas=batch_metadata)
-            logging.info(f"Inserted batch {i} - {i+len(batch_docs)}")
-            
         logging.info("Data Ingestion Completed Successfully.")
     except Exception as e:
         raise ChatbotException(e,sys)
     
-# if __name__ == "__main__":
-#     main()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load interview questions into the vector index")
+    parser.add_argument("--resume", action="store_true", help="continue from the last checkpointed batch")
+    args = parser.parse_args()
+    main(resume=args.resume)
@@ -0,0 +1,103 @@
+import re, zlib
+import numpy as np
+from typing import List, Dict
+
+from chatbot.components.src_logging.logger import logging
+
+# Largest prime below 2**31, keeps a*h + b inside uint64 for 32 bit shingle hashes
+_PRIME = np.uint64((1 << 31) - 1)
+
+class MinHashDeduplicator:
+    """
+    Collapses near-duplicate questions coming from different loaders.
+
+    Every question is reduced to a MinHash signature over word shingles and the
+    signatures are bucketed with LSH banding, so only items that share a band are
+    ever compared. That keeps the stage roughly linear in corpus size instead of
+    comparing all pairs. Each cluster keeps one canonical entry (the one with the
+    longest answer) and the sources of all members are merged into its metadata.
+    """
+    def __init__(self, num_perm: int = 128, bands: int = 32, threshold: float = 0.7,
+                 shingle_size: int = 3, seed: int = 42):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, int(_PRIME), size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, int(_PRIME), size=num_perm).astype(np.uint64)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        # Drop "Question:" / "Q12." style prefixes which differ between sources
+        text = re.sub(r"^\s*(question\s*:)?\s*(q\d+[\.:])?\s*", "", text.lower())
+        return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+    def shingles(self, text: str) -> np.ndarray:
+        tokens = self.normalize(text).split()
+        k = self.shingle_size
+        if len(tokens) < k:
+            grams = [" ".join(tokens)]
+        else:
+            grams = [" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)]
+        return np.fromiter({zlib.crc32(g.encode()) for g in grams}, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = self.shingles(text)
+        # (num_perm, n_shingles) permuted hashes, min over shingles
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+    def deduplicate(self, items: List[Dict]) -> List[Dict]:
+        """
+        Takes loader records ({"text", "metadata"}) and returns the canonical records,
+        with metadata["sources"] listing every source the question was found in.
+        """
+        if not items:
+            return []
+
+        signatures = np.vstack([self.signature(item["text"]) for item in items])
+
+        parent = list(range(len(items)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for band in range(self.bands):
+            band_slice = signatures[:, band * self.rows:(band + 1) * self.rows]
+            buckets = {}
+            for i, key in enumerate(map(bytes, band_slice)):
+                rep = buckets.setdefault(key, i)
+                if rep == i:
+                    continue
+                # Verify against the bucket representative to weed out LSH false positives
+                if np.mean(signatures[rep] == signatures[i]) >= self.threshold:
+                    ri, rj = find(rep), find(i)
+                    if ri != rj:
+                        parent[rj] = ri
+
+        clusters = {}
+        for i in range(len(items)):
+            clusters.setdefault(find(i), []).append(i)
+
+        results = []
+        for members in clusters.values():
+            canonical = max(members, key=lambda i: len(items[i]["metadata"].get("answer", "")))
+            metadata = dict(items[canonical]["metadata"])
+            metadata["sources"] = sorted({items[i]["metadata"].get("source", "") for i in members})
+            results.append({"text": items[canonical]["text"], "metadata": metadata})
+
+        ratio = len(items) / len(results)
+        logging.info(
+            f"Deduplication: {len(items)} -> {len(results)} questions "
+            f"(compression ratio {ratio:.2f}x, {len(items) - len(results)} near-duplicates collapsed)"
+        )
+        return results
@@ -1,25 +1,30 @@
-import os
 from dotenv import load_dotenv
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from chatbot.components.rag_implementation.rag_engine import RagEngine
+from chatbot.components.llm.llm_client import build_chat_model
+from chatbot.components.rag_implementation.topics import CoverageTracker
+from chatbot.components.llm.scheduler import llm_scheduler, Priority, estimate_tokens
+from chatbot.components.judge.answer_scoring import AnswerScorer, condense_reply
 
 load_dotenv()
 
 class InterviewLoop:
-    def __init__(self, role, resume_context=None):
-        # 1. Setup Model
-        self.llm = HuggingFaceEndpoint(
-            repo_id="meta-llama/Llama-3.1-8B-Instruct",
-            huggingfacehub_api_token=os.getenv("HUGGINGFACE_HUB_ACCESS_KEY"),
-            task="text-generation",
-            temperature=0.4
-        )
-        self.model = ChatHuggingFace(llm=self.llm)
-        self.rag = RagEngine()
+    def __init__(self, role, resume_context=None, model=None, rag=None):
+        # 1. Setup Model, a model or RAG engine can be passed in (e.g. offline fakes for benchmarks)
+        self.model = model or build_chat_model(temperature=0.4)
+        self.llm = getattr(self.model, "llm", None)
+        self.rag = rag or RagEngine()
+        self.coverage = CoverageTracker()
+        self.answer_scorer = AnswerScorer(self.rag.embeddings)
+        self.last_answer_score = None
+        self.reply_scores = {}  # chat_history index of a scored reply -> its score
+        self.code_results = []
+        self.turns = 0  # completed turns, numbers the rows persisted for this session
 
         self.resume_context = resume_context if resume_context else "no resume provided"
+        # Embedded once per session, retrieval blends it into every topic query
+        self.resume_vector = self.rag.embed_resume(resume_context)
         self.role = role
 
         # 2. Initial Chat History
@@ -46,12 +51,16 @@ class InterviewLoop:
         self.chat_history = sys_msg.invoke({'role': self.role, 'resume_context': self.resume_context}).to_messages()
 
     def process_turn(self, user_input):
-        self.chat_history.append(HumanMessage(content=user_input))
+        # New messages only join the history once the model has answered,
+        # so a turn rejected by admission control can simply be retried
+        new_messages = [HumanMessage(content=user_input)]
 
         # RAG INTEGRATION START
         # We inject a hidden instruction telling the model exactly what to ask next
         # This keeps your flow but forces it to use your Database questions.
-        q_text, hidden_ans = self.rag.get_interview_question("Data Science")
+        # Retrieve from the least covered topic so the interview spreads across all of them
+        topic = self.coverage.next_topic()
+        q_text, hidden_ans = self.rag.get_interview_question(topic, self.resume_vector)
         
         if q_text:
             # We add a temporary system message to guide the Llama model
@@ -64,24 +73,64 @@ class InterviewLoop:
             Your NEXT question MAY or MAY NOT be based on this retrieved text: "{q_text}". 
             Do not answer it yourself. Just ask it to the candidate.)
             """
-            self.chat_history.append(SystemMessage(content=rag_instruction))
+            new_messages.append(SystemMessage(content=rag_instruction))
 
-        response = self.model.invoke(self.chat_history)
+        # The opening turn of an interview queues behind turns of interviews already running
+        started = any(isinstance(msg, AIMessage) for msg in self.chat_history)
+        priority = Priority.CHAT if started else Priority.START
+        messages = self.chat_history + new_messages
+        with llm_scheduler.acquire(priority, estimate_tokens(messages)):
+            response = self.model.invoke(messages)
         ai_msg = response.content
 
+        reply_index = len(self.chat_history)
+        self.chat_history.extend(new_messages)
         self.chat_history.append(AIMessage(content=ai_msg))
+        self.turns += 1
+
+        # Grade the reply against the reference answer of the question it answers,
+        # then check whether the interviewer went on to ask the newly retrieved one
+        self.last_answer_score = self.answer_scorer.score_reply(user_input)
+        if self.last_answer_score is not None:
+            self.reply_scores[reply_index] = self.last_answer_score
+        # A topic only counts as covered once the interviewer actually asked its question,
+        # a topic it keeps skipping is rotated past after a few turns
+        if self.answer_scorer.question_offered(topic, q_text, hidden_ans, ai_msg, self.rag.last_question_vector):
+            self.coverage.mark_covered(topic)
+        else:
+            self.coverage.mark_offered(topic)
 
         return ai_msg
     
-    def get_transcript_str(self):
+    def record_code_result(self, problem: str, result: dict):
+        """
+        Attaches a code runner result to the session, the interviewer sees it on the next turn
+        and the judge gets it with the transcript.
         """
-        convert the chat history objects into a readable string for the judge
+        summary = f"{problem}: {result['status']}, {result['passed']}/{result['total']} tests passed"
+        if result.get("error"):
+            summary += f" ({result['error'].splitlines()[-1]})"
+        self.code_results.append(summary)
+        self.chat_history.append(SystemMessage(content=f"(Code runner result for the candidate's solution to {summary})"))
+        return summary
+
+    def get_transcript_str(self, condense_scored: bool = False):
+        """
+        convert the chat history objects into a readable string for the judge.
+        With condense_scored, replies scored against a reference answer are cut
+        to an excerpt, the judge reads them from the similarity table instead.
         """
         transcript = ""
-        for msg in self.chat_history:
+        for i, msg in enumerate(self.chat_history):
             if isinstance(msg, SystemMessage):
                 continue
 
             role = "Interviewer" if isinstance(msg, AIMessage) else "Candidate"
-            transcript += f"{role}: {msg.content} \n\n"
+            content = msg.content
+            if condense_scored and i in self.reply_scores:
+                content = condense_reply(content, self.reply_scores[i])
+            transcript += f"{role}: {content} \n\n"
+
+        if self.code_results:
+            transcript += "Code runner results:\n" + "\n".join(f"- {r}" for r in self.code_results) + "\n"
         return transcript
\ No newline at end of file
@@ -0,0 +1,77 @@
+import asyncio, hashlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from fastapi.concurrency import run_in_threadpool
+
+from chatbot.components.src_logging.logger import logging
+
+class TurnCoordinator:
+    """
+    Serialises /chat turns per interview session and coalesces duplicate submits.
+
+    Turns of one session run strictly one after another under a per-session lock,
+    so history appends never interleave. A request that repeats the idempotency key
+    of a turn that is in flight (or recently finished) awaits that turn's result
+    instead of paying for another LLM generation. Without an explicit key, an
+    identical message arriving while the same message is still in flight is treated
+    as a double submit too.
+    """
+    def __init__(self, remembered_results: int = 16):
+        self.remembered_results = remembered_results
+        self._locks: Dict[Any, asyncio.Lock] = {}
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+        self._results: Dict[Any, OrderedDict] = {}
+        self.metrics = {"turns": 0, "llm_calls": 0, "coalesced": 0}
+
+    async def run(self, session_key, message: str, idempotency_key: Optional[str], fn: Callable[[], Any]):
+        self.metrics["turns"] += 1
+        key = idempotency_key or "msg:" + hashlib.sha1(message.encode("utf-8")).hexdigest()
+
+        finished = self._results.get(session_key, {})
+        if idempotency_key and key in finished:
+            self.metrics["coalesced"] += 1
+            logging.info(f"Duplicate chat submit {key} answered from the finished turn")
+            return finished[key]
+
+        pending = self._in_flight.get((session_key, key))
+        if pending is not None:
+            self.metrics["coalesced"] += 1
+            logging.info(f"Duplicate chat submit {key} coalesced with the in-flight turn")
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the exception as retrieved when no duplicate is waiting on it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[(session_key, key)] = future
+
+        try:
+            async with self.session_lock(session_key):
+                self.metrics["llm_calls"] += 1
+                result = await run_in_threadpool(fn)
+            if idempotency_key:
+                results = self._results.setdefault(session_key, OrderedDict())
+                results[key] = result
+                while len(results) > self.remembered_results:
+                    results.popitem(last=False)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._in_flight.pop((session_key, key), None)
+
+    def session_lock(self, session_key) -> asyncio.Lock:
+        return self._locks.setdefault(session_key, asyncio.Lock())
+
+    def forget(self, session_key):
+        """
+        Drops the lock and remembered results of a finished session.
+        """
+        self._locks.pop(session_key, None)
+        self._results.pop(session_key, None)
+
+turn_coordinator = TurnCoordinator()
@@ -0,0 +1,225 @@
+import os, pwd, sys, json, time, queue, select, signal, threading, subprocess
+from typing import Optional
+
+from chatbot.components.src_logging.logger import logging
+from chatbot.components.exception.exception import ChatbotException
+
+CODE_RUNNER_WORKERS = int(os.getenv("CODE_RUNNER_WORKERS", "2"))
+CODE_RUNNER_TIME_LIMIT = float(os.getenv("CODE_RUNNER_TIME_LIMIT", "2"))
+CODE_RUNNER_MEMORY_MB = int(os.getenv("CODE_RUNNER_MEMORY_MB", "256"))
+MAX_CODE_CHARS = int(os.getenv("MAX_CODE_CHARS", "20000"))
+# Account the workers switch to when the app itself runs as root
+CODE_RUNNER_USER = os.getenv("CODE_RUNNER_USER", "nobody")
+MAX_TEST_CASES = 50
+PROBLEMS_PATH = os.getenv("CODE_PROBLEMS_PATH", os.path.join(os.path.dirname(__file__), "problems.json"))
+SANDBOX_PATH = os.path.join(os.path.dirname(__file__), "sandbox.py")
+
+STATUSES = ("ok", "timeout", "memory", "error")
+MAX_REPR_CHARS = 200
+MAX_OUTPUT_CHARS = 2000
+# Submitted code can write to the report pipe itself, so read no more than this
+MAX_REPORT_BYTES = 8 * 1024 * 1024
+
+class InvalidSubmission(Exception):
+    pass
+
+def _short_repr(value):
+    text = repr(value)
+    return text if len(text) <= MAX_REPR_CHARS else text[:MAX_REPR_CHARS - 3] + "..."
+
+def _text(value, limit):
+    return value[:limit] if isinstance(value, str) else None
+
+def _failure(status: str, error: str, cases: list) -> dict:
+    return {"status": status, "error": error, "passed": 0, "total": len(cases), "cases": [], "stdout": "", "ms": None}
+
+def grade(report, cases: list) -> dict:
+    """
+    Grades a worker's report against the expected values. The report comes from
+    the process that ran the submission, so it is validated field by field and
+    only the outputs are taken from it, pass/fail is decided here.
+    """
+    if not isinstance(report, dict) or report.get("status") not in STATUSES:
+        return _failure("error", "Worker returned an invalid report", cases)
+    outputs = report.get("outputs")
+    if not isinstance(outputs, list) or not all(isinstance(o, dict) for o in outputs) or len(outputs) > len(cases) \
+            or (report["status"] == "ok" and cases and len(outputs) != len(cases)):
+        return _failure("error", "Worker returned an invalid report", cases)
+
+    results = []
+    for case, output in zip(cases, outputs):
+        error = _text(output.get("error"), MAX_OUTPUT_CHARS)
+        ms = output.get("ms")
+        results.append({
+            "passed": error is None and "value" in output and output["value"] == case["expected"],
+            "output": _text(output.get("repr"), MAX_REPR_CHARS),
+            "error": error,
+            "args": _short_repr(case.get("args", [])),
+            "expected": _short_repr(case["expected"]),
+            "ms": ms if isinstance(ms, (int, float)) and not isinstance(ms, bool) else None,
+        })
+    ms = report.get("ms")
+    return {
+        "status": report["status"],
+        "error": _text(report.get("error"), MAX_OUTPUT_CHARS),
+        "passed": sum(r["passed"] for r in results),
+        "total": len(cases),
+        "cases": results,
+        "stdout": _text(report.get("stdout"), MAX_OUTPUT_CHARS) or "",
+        "ms": ms if isinstance(ms, (int, float)) and not isinstance(ms, bool) else None,
+    }
+
+def load_problems(path: str = PROBLEMS_PATH) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+class CodeRunner:
+    """
+    Runs candidate code against test cases in a pool of pre-started worker processes.
+
+    Each worker is a fresh isolated interpreter (`python -I sandbox.py`) with an
+    empty environment. Before running a submission it drops to an unprivileged uid
+    (CODE_RUNNER_USER when the app runs as root), applies rlimits on CPU time,
+    address space, file writes and child processes, and installs a seccomp filter
+    that denies opening files, sockets, fork/exec and signalling other processes.
+    So the app's environment (/proc/<ppid>/environ), files and network are out of
+    reach. A worker that can't lock itself down refuses the job.
+
+    The worker only reports the outputs. It never sees the expected values, and
+    pass/fail is decided here from a validated report, so code that tampers with
+    the worker or writes its own report can't fake a passing result.
+
+    A worker serves a single submission and is replaced in the background, so
+    interpreter start-up stays off the request path and nothing leaks between
+    candidates. A worker that overruns the wall-clock limit is killed.
+    """
+    def __init__(self, workers: int = CODE_RUNNER_WORKERS, time_limit: float = CODE_RUNNER_TIME_LIMIT,
+                 memory_mb: int = CODE_RUNNER_MEMORY_MB):
+        self.workers = workers
+        self.time_limit = time_limit
+        self.memory_mb = memory_mb
+        self.problems = load_problems()
+        self.sandbox_ids = []
+        if os.geteuid() == 0:
+            account = pwd.getpwnam(CODE_RUNNER_USER)
+            self.sandbox_ids = [str(account.pw_uid), str(account.pw_gid)]
+        self._idle = queue.Queue()
+        self._started = False
+        self._lock = threading.Lock()
+
+    def _spawn(self):
+        return subprocess.Popen(
+            [sys.executable, "-I", SANDBOX_PATH, str(self.time_limit), str(self.memory_mb), *self.sandbox_ids],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            env={}, start_new_session=True
+        )
+
+    def _replenish(self):
+        threading.Thread(target=lambda: self._idle.put(self._spawn()), daemon=True).start()
+
+    def start(self):
+        with self._lock:
+            if not self._started:
+                for _ in range(self.workers):
+                    self._idle.put(self._spawn())
+                self._started = True
+                logging.info(f"Code runner started {self.workers} sandbox workers")
+
+    def close(self):
+        with self._lock:
+            while not self._idle.empty():
+                self._idle.get_nowait().kill()
+            self._started = False
+
+    def _take_worker(self):
+        self.start()
+        try:
+            worker = self._idle.get(timeout=1)
+        except queue.Empty:
+            # Every worker is busy and none has been replaced yet
+            worker = self._spawn()
+        else:
+            self._replenish()
+        return worker if worker.poll() is None else self._spawn()
+
+    def _exchange(self, worker, job: bytes) -> bytes:
+        """
+        Sends the job and reads the report, at most MAX_REPORT_BYTES and until the
+        wall-clock limit (plus a grace period for the transfer). Kills the worker on
+        either overrun and returns what makes no valid report.
+        """
+        worker.stdin.write(job)
+        worker.stdin.close()
+        deadline = time.monotonic() + self.time_limit + 1
+        fd = worker.stdout.fileno()
+        chunks, size = [], 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                worker.kill()
+                worker.wait()
+                return b""
+            data = os.read(fd, 65536)
+            if not data:
+                break
+            chunks.append(data)
+            size += len(data)
+            if size > MAX_REPORT_BYTES:
+                worker.kill()
+                worker.wait()
+                return b"{}"
+        worker.stdout.close()
+        worker.wait(timeout=max(0.1, deadline - time.monotonic()))
+        return b"".join(chunks)
+
+    def list_problems(self):
+        return [
+            {"id": pid, "title": p["title"], "prompt": p["prompt"], "function": p["function"], "tests": len(p["cases"])}
+            for pid, p in self.problems.items()
+        ]
+
+    def run(self, code: str, problem_id: Optional[str] = None, function: Optional[str] = None,
+            cases: Optional[list] = None) -> dict:
+        """
+        Executes `code` against a registered problem, or against the given function
+        name and cases. Without either, the code is only executed.
+        """
+        if len(code) > MAX_CODE_CHARS:
+            raise InvalidSubmission(f"Code is longer than {MAX_CODE_CHARS} characters")
+        if problem_id:
+            if problem_id not in self.problems:
+                raise InvalidSubmission(f"Unknown problem '{problem_id}'")
+            function, cases = self.problems[problem_id]["function"], self.problems[problem_id]["cases"]
+        cases = cases or []
+        if len(cases) > MAX_TEST_CASES:
+            raise InvalidSubmission(f"At most {MAX_TEST_CASES} test cases are allowed")
+        if any("expected" not in case for case in cases):
+            raise InvalidSubmission("Every test case needs an expected value")
+
+        try:
+            worker = self._take_worker()
+            # Only the args, the worker never sees what the outputs are graded against
+            job = json.dumps({"code": code, "function": function, "args": [case.get("args", []) for case in cases]}) + "\n"
+            try:
+                out = self._exchange(worker, job.encode("utf-8"))
+            except subprocess.TimeoutExpired:
+                worker.kill()
+                worker.wait()
+                out = b""
+        except Exception as e:
+            raise ChatbotException(e, sys)
+
+        try:
+            result = grade(json.loads(out), cases)
+        except ValueError:
+            # Killed by us or by the CPU limit, or crashed before reporting
+            killed = worker.returncode in (-signal.SIGKILL, -signal.SIGXCPU) or not out
+            result = _failure("timeout" if killed else "error",
+                              f"Time limit of {self.time_limit}s exceeded" if killed else f"Worker exited with {worker.returncode}",
+                              cases)
+
+        logging.info(f"Code submission for {problem_id or function or 'no tests'}: {result['status']}, "
+                     f"{result['passed']}/{result['total']} passed")
+        return result
+
+code_runner = CodeRunner()
@@ -0,0 +1,206 @@
+# Worker process of the code runner, started as `python -I sandbox.py <time_limit> <memory_mb> [<uid> <gid>]`
+# with an empty environment. Stdlib only, nothing from the app is imported here.
+# Reads one JSON job from stdin, locks itself down, writes one JSON report of the outputs and exits.
+import os, io, sys, copy, json, math, time, ctypes, struct, signal, platform, resource, traceback
+from contextlib import redirect_stdout
+
+# Modules submissions may import. Nothing can be opened once the sandbox is locked
+# down, so anything else fails to import.
+import array, bisect, collections, dataclasses, decimal, enum, fractions, functools, heapq, itertools, \
+    operator, random, re, statistics, string, typing
+
+MAX_OUTPUT_CHARS = 2000
+MAX_REPR_CHARS = 200
+MAX_VALUE_CHARS = 100_000
+
+class TimeLimitExceeded(BaseException):
+    # BaseException so a bare `except Exception` in submitted code can't swallow it
+    pass
+
+def _on_alarm(signum, frame):
+    raise TimeLimitExceeded()
+
+class SandboxUnavailable(Exception):
+    pass
+
+# Denied with EPERM: opening files (so nothing under /proc, including the parent's
+# environ), sockets, new processes and exec, signalling or tracing other processes,
+# namespaces and mounts, and io_uring, which would bypass the rest
+DENIED_SYSCALLS = {
+    "x86_64": (0xC000003E, [
+        2, 85, 257, 437, 304, 303,                  # open, creat, openat, openat2, open/name_to_handle_at
+        41, 53, 42, 49, 50, 43, 288,                # socket, socketpair, connect, bind, listen, accept, accept4
+        56, 57, 58, 435, 59, 322,                   # clone, fork, vfork, clone3, execve, execveat
+        62, 200, 234, 129, 297, 424, 434, 438,      # kill, tkill, tgkill, rt_(tg)sigqueueinfo, pidfd_*
+        101, 310, 311,                              # ptrace, process_vm_readv/writev
+        272, 308, 165, 161, 155,                    # unshare, setns, mount, chroot, pivot_root
+        425, 426, 427, 321, 298, 323, 250, 135,     # io_uring_*, bpf, perf_event_open, userfaultfd, keyctl, personality
+    ]),
+    "aarch64": (0xC00000B7, [
+        56, 437, 265, 264,
+        198, 199, 203, 200, 201, 202, 242,
+        220, 435, 221, 281,
+        129, 130, 131, 138, 240, 424, 434, 438,
+        117, 270, 271,
+        97, 268, 40, 51, 41,
+        425, 426, 427, 280, 241, 282, 219, 92,
+    ]),
+}
+X32_SYSCALL_BIT = 0x40000000
+PR_SET_NO_NEW_PRIVS, PR_SET_SECCOMP, SECCOMP_MODE_FILTER = 38, 22, 2
+SECCOMP_RET_ALLOW, SECCOMP_RET_ERRNO, SECCOMP_RET_KILL_PROCESS = 0x7FFF0000, 0x00050000, 0x80000000
+
+def _bpf(code, k, jt=0, jf=0):
+    return struct.pack("HBBI", code, jt, jf, k)
+
+def _install_seccomp():
+    machine = platform.machine()
+    if machine not in DENIED_SYSCALLS:
+        raise SandboxUnavailable(f"No syscall filter for {machine}")
+    audit_arch, denied = DENIED_SYSCALLS[machine]
+    deny = SECCOMP_RET_ERRNO | 1  # EPERM
+
+    load, jeq, jge, ret = 0x20, 0x15, 0x35, 0x06
+    program = [_bpf(load, 4), _bpf(jeq, audit_arch, jt=1), _bpf(ret, SECCOMP_RET_KILL_PROCESS), _bpf(load, 0)]
+    if machine == "x86_64":
+        program += [_bpf(jge, X32_SYSCALL_BIT, jf=1), _bpf(ret, deny)]
+    for nr in denied:
+        program += [_bpf(jeq, nr, jf=1), _bpf(ret, deny)]
+    program.append(_bpf(ret, SECCOMP_RET_ALLOW))
+
+    filters = ctypes.create_string_buffer(b"".join(program))
+    fprog = struct.pack("HP", len(program), ctypes.addressof(filters))
+    fprog_buffer = ctypes.create_string_buffer(fprog)
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.prctl.argtypes = [ctypes.c_int] + [ctypes.c_ulong] * 4
+    if libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) != 0 or \
+            libc.prctl(PR_SET_SECCOMP, SECCOMP_MODE_FILTER, ctypes.addressof(fprog_buffer), 0, 0) != 0:
+        raise SandboxUnavailable(f"Installing the syscall filter failed: {os.strerror(ctypes.get_errno())}")
+
+def _drop_privileges(uid, gid):
+    if uid is not None:
+        os.setgroups([])
+        os.setgid(gid)
+        os.setuid(uid)
+    if os.geteuid() == 0 or os.getegid() == 0:
+        raise SandboxUnavailable("Refusing to run submissions as root")
+
+def lock_down(time_limit: float, memory_mb: int, uid=None, gid=None):
+    """
+    Drops to the unprivileged uid, applies the rlimits and installs the syscall
+    filter. Irreversible, and must run before any submitted code.
+    """
+    # Relative paths shouldn't resolve into the app's directory
+    os.chdir("/")
+    _drop_privileges(uid, gid)
+
+    cpu_seconds = math.ceil(time_limit) + 1
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+    resource.setrlimit(resource.RLIMIT_AS, (memory_mb * 1024 * 1024, memory_mb * 1024 * 1024))
+    # No file writes and no child processes
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+    _install_seccomp()
+
+    # ctypes could only be re-imported from sys.modules now, don't leave it there
+    for name in [m for m in sys.modules if m == "ctypes" or m.startswith(("ctypes.", "_ctypes"))]:
+        del sys.modules[name]
+
+def _short_repr(value):
+    text = repr(value)
+    return text if len(text) <= MAX_REPR_CHARS else text[:MAX_REPR_CHARS - 3] + "..."
+
+def _jsonable(value):
+    # Exact JSON form of a return value, tuples as lists like the expected values.
+    # Anything JSON can't represent faithfully (sets, non-str keys, objects) raises TypeError.
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, dict) and all(isinstance(k, str) for k in value):
+        return {k: _jsonable(v) for k, v in value.items()}
+    raise TypeError(type(value).__name__)
+
+def _encode_output(output):
+    encoded = {"repr": _short_repr(output), "error": None}
+    try:
+        value = _jsonable(output)
+        if len(json.dumps(value)) <= MAX_VALUE_CHARS:
+            encoded["value"] = value
+    except (TypeError, ValueError, RecursionError):
+        pass  # only the repr goes back, the case can't pass
+    return encoded
+
+def _error(e: BaseException):
+    return "".join(traceback.format_exception_only(type(e), e)).strip()
+
+def execute(code: str, function: str, case_args: list, time_limit: float) -> dict:
+    """
+    Executes `code`, then calls `function` with each case's args and reports the
+    outputs. Grading happens in the parent: the expected values never reach this
+    process, and the parent trusts nothing in the report. Always returns a
+    JSON-serialisable dict.
+    """
+    signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, time_limit)
+
+    stdout = io.StringIO()
+    results = []
+    status = "ok"
+    error = None
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(stdout):
+            namespace = {"__name__": "__submission__"}
+            exec(compile(code, "<submission>", "exec"), namespace)
+
+            fn = namespace.get(function) if function else None
+            if function and not callable(fn):
+                status, error = "error", f"Function '{function}' is not defined"
+            for args in case_args if fn else []:
+                case_start = time.perf_counter()
+                try:
+                    results.append(_encode_output(fn(*copy.deepcopy(args))))
+                except (TimeLimitExceeded, MemoryError):
+                    raise
+                except Exception as e:
+                    results.append({"repr": None, "error": _error(e)})
+                results[-1]["ms"] = round((time.perf_counter() - case_start) * 1000, 3)
+    except TimeLimitExceeded:
+        status, error = "timeout", f"Time limit of {time_limit}s exceeded"
+    except MemoryError:
+        status, error = "memory", "Memory limit exceeded"
+    except BaseException as e:
+        status, error = "error", _error(e)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+    return {
+        "status": status,
+        "error": error,
+        "outputs": results,
+        "stdout": stdout.getvalue()[:MAX_OUTPUT_CHARS],
+        "ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+def main():
+    time_limit, memory_mb = float(sys.argv[1]), int(sys.argv[2])
+    uid, gid = (int(sys.argv[3]), int(sys.argv[4])) if len(sys.argv) > 4 else (None, None)
+    # Keep a private handle on stdout for the result, submitted code writing to fd 1 goes nowhere
+    result_fd = os.dup(1)
+    os.dup2(os.open(os.devnull, os.O_WRONLY), 1)
+
+    job = json.loads(sys.stdin.readline())
+    try:
+        lock_down(time_limit, memory_mb, uid, gid)
+    except Exception as e:
+        # Fail closed, the submission is not executed
+        result = {"status": "error", "error": f"Sandbox unavailable: {e}", "outputs": [], "stdout": "", "ms": None}
+    else:
+        result = execute(job["code"], job.get("function"), job.get("args", []), time_limit)
+    with os.fdopen(result_fd, "w") as out:
+        json.dump(result, out)
+
+if __name__ == "__main__":
+    main()
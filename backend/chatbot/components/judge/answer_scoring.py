@@ -0,0 +1,100 @@
+import os
+import numpy as np
+
+from chatbot.components.src_logging.logger import logging
+from chatbot.components.rag_implementation.rag_engine import MISSING_ANSWER
+
+# Min similarity between the interviewer's message and a retrieved question to count it as asked
+ASKED_THRESHOLD = float(os.getenv("ASKED_SIMILARITY_THRESHOLD", "0.5"))
+TABLE_QUESTION_CHARS = 120
+# Scored replies go to the judge as an excerpt, the similarity table stands in for the rest
+SCORED_REPLY_CHARS = int(os.getenv("JUDGE_SCORED_REPLY_CHARS", "200"))
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+def condense_reply(reply: str, score: float) -> str:
+    """
+    A scored candidate reply as it appears in the judge's transcript.
+    """
+    text = " ".join(reply.split())
+    if len(text) > SCORED_REPLY_CHARS:
+        text = text[:SCORED_REPLY_CHARS - 3] + "..."
+    return f"{text} [similarity to the reference answer: {score:.2f}]"
+
+class AnswerScorer:
+    """
+    Cheap per-question grading with the already loaded query encoder.
+
+    The retrieved question is only a suggestion to the interviewer, so it is
+    recorded once the interviewer's message is close enough to it. Every reply
+    until the next retrieved question is asked is scored by cosine similarity to
+    the reference answer, keeping the best one (the interviewer may give hints).
+
+    A turn costs one encoder pass for the interviewer's message, plus one for the
+    reply while a question is open. The question's stored snapshot vector is used
+    when retrieval provides it, and the reference answer is only embedded once the
+    question was actually asked.
+    """
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.records = []
+        self._open = None  # record of the question currently being answered
+        self._reference_vec = None
+
+    def score_reply(self, reply: str):
+        """
+        Scores a candidate reply against the open question, None if there is none.
+        """
+        if self._open is None or not reply.strip():
+            return None
+
+        reply_vec = _normalize(self.embeddings.embed_query(reply))
+        score = round(float(reply_vec @ self._reference_vec), 3)
+        self._open["replies"] += 1
+        self._open["score"] = max(self._open["score"] or 0.0, score)
+        logging.info(f"Reply to {self._open['topic']} question scored {score} against the reference answer")
+        return score
+
+    def question_offered(self, topic: str, question: str, reference: str, interviewer_msg: str,
+                         question_vector=None):
+        """
+        Called after the interviewer replied to a turn that injected `question`.
+        Returns whether the interviewer actually asked it, and if so opens a new
+        record to score the following replies against its reference answer.
+        """
+        if not question:
+            return False
+
+        if question_vector is not None:
+            question_vec, msg_vec = _normalize(question_vector), _normalize(self.embeddings.embed_query(interviewer_msg))
+        else:
+            question_vec, msg_vec = _normalize(self.embeddings.embed_documents([question, interviewer_msg]))
+        if float(question_vec @ msg_vec) < ASKED_THRESHOLD:
+            return False
+
+        if not reference or reference == MISSING_ANSWER:
+            # Asked, but nothing to score the replies against
+            self._open = self._reference_vec = None
+            return True
+        self._open = {"topic": topic, "question": question, "score": None, "replies": 0}
+        self._reference_vec = _normalize(self.embeddings.embed_query(reference))
+        self.records.append(self._open)
+        return True
+
+    def table(self) -> str:
+        """
+        Compact markdown table of the scored questions for the judge prompt.
+        """
+        rows = [r for r in self.records if r["replies"]]
+        if not rows:
+            return "No retrieved reference questions were answered."
+
+        lines = ["| # | Topic | Question | Similarity | Replies |", "|---|---|---|---|---|"]
+        for i, r in enumerate(rows, 1):
+            question = " ".join(r["question"].split())
+            if len(question) > TABLE_QUESTION_CHARS:
+                question = question[:TABLE_QUESTION_CHARS - 3] + "..."
+            lines.append(f"| {i} | {r['topic']} | {question.replace('|', '/')} | {r['score']:.2f} | {r['replies']} |")
+        return "\n".join(lines)
@@ -1,6 +1,5 @@
-import os, sys
+import sys
 from dotenv import load_dotenv
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
@@ -8,6 +7,8 @@ from typing import List
 
 from chatbot.components.exception.exception import ChatbotException
 from chatbot.components.src_logging.logger import logging
+from chatbot.components.llm.llm_client import build_chat_model
+from chatbot.components.llm.scheduler import llm_scheduler, Priority, AdmissionRejected, estimate_tokens
 
 load_dotenv()
 
@@ -20,21 +21,16 @@ class InterviewFeedback(BaseModel):
     improvements: List[str] = Field(description="List of suggestions for improvement")
 
 class InterviewJudge:
-    def __init__(self):
+    def __init__(self, llm=None):
         try:
-            self.model = HuggingFaceEndpoint(
-                repo_id="meta-llama/Llama-3.1-8B-Instruct",
-                huggingfacehub_api_token=os.getenv("HUGGINGFACE_HUB_ACCESS_KEY"),
-                task="text-generation",
-                temperature=0.4
-            )
-            self.llm = ChatHuggingFace(llm=self.model)
+            self.llm = llm or build_chat_model(temperature=0.4)
+            self.model = getattr(self.llm, "llm", None)
 
             self.parser = JsonOutputParser(pydantic_object=InterviewFeedback)
         except Exception as e:
             raise ChatbotException(e, sys)
     
-    def evaluate_interview(self, transcript_text):
+    def evaluate_interview(self, transcript_text, answer_scores=""):
         try:
             # Removed the loop. We assume transcript_text is already a formatted string.
             
@@ -46,10 +42,15 @@ class InterviewJudge:
                 
                 TRANSCRIPT:
                 {transcript}
+
+                REFERENCE ANSWER SIMILARITY (cosine similarity between the candidate's best reply and the
+                reference answer of each question from the question bank, roughly 0.3 is unrelated and 0.8+ is close).
+                Replies marked with a similarity are shortened in the transcript, grade them with this table:
+                {answer_scores}
                 
                 {format_instructions}
                 """,
-                input_variables=["transcript"],
+                input_variables=["transcript", "answer_scores"],
                 partial_variables={"format_instructions": self.parser.get_format_instructions()}
             )
 
@@ -57,7 +58,10 @@ class InterviewJudge:
             logging.info("Generating interview feedback")
 
             # Pass the text directly
-            return chain.invoke({"transcript": transcript_text})
-            
+            with llm_scheduler.acquire(Priority.JUDGE, estimate_tokens([prompt.template, transcript_text, answer_scores])):
+                return chain.invoke({"transcript": transcript_text, "answer_scores": answer_scores or "Not available."})
+
+        except AdmissionRejected:
+            raise
         except Exception as e:
             raise ChatbotException(e, sys)
\ No newline at end of file
@@ -0,0 +1,221 @@
+import os, sys, json, time, argparse, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+import numpy as np
+
+from chatbot.components.exception.exception import ChatbotException
+from chatbot.components.src_logging.logger import logging
+from chatbot.components.judge.judge_logic import InterviewJudge
+from chatbot.components.judge.answer_scoring import condense_reply
+from chatbot.components.llm.scheduler import AdmissionRejected, estimate_tokens
+from database import models, rollups
+from database.database import session_local, engine
+
+REJUDGE_CHECKPOINT_DIR = os.getenv("REJUDGE_CHECKPOINT_DIR", os.path.join("artifacts", "rejudge"))
+MAX_ADMISSION_RETRIES = 5
+SPEAKERS = {"interviewer": "Interviewer", "candidate": "Candidate"}
+
+def format_transcript(turns) -> str:
+    """
+    Same layout as InterviewLoop.get_transcript_str(condense_scored=True), built from persisted turns.
+    """
+    transcript = ""
+    code_results = []
+    for turn in turns:
+        if turn.speaker == "code_runner":
+            code_results.append(turn.content)
+            continue
+        content = turn.content
+        if turn.speaker == "candidate" and turn.answer_score is not None:
+            content = condense_reply(content, turn.answer_score)
+        transcript += f"{SPEAKERS[turn.speaker]}: {content} \n\n"
+    if code_results:
+        transcript += "Code runner results:\n" + "\n".join(f"- {r}" for r in code_results) + "\n"
+    return transcript
+
+def score_table(turns) -> str:
+    scored = [t for t in turns if t.speaker == "candidate" and t.answer_score is not None]
+    if not scored:
+        return ""
+    lines = ["| Turn | Similarity of the reply |", "|---|---|"]
+    lines += [f"| {t.turn} | {t.answer_score:.2f} |" for t in scored]
+    return "\n".join(lines)
+
+class RejudgeCheckpoint:
+    """
+    Judged and failed interview ids of a run, rewritten atomically after every
+    result so an interrupted run picks up where it stopped.
+    """
+    def __init__(self, run_name: str, root: str = REJUDGE_CHECKPOINT_DIR):
+        os.makedirs(root, exist_ok=True)
+        self.path = os.path.join(root, f"{run_name}.json")
+        self.state = {"done": {}, "failed": {}}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                self.state = json.load(f)
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+    def is_done(self, interview_id: int) -> bool:
+        return str(interview_id) in self.state["done"]
+
+    def mark_done(self, interview_id: int, result: dict):
+        self.state["done"][str(interview_id)] = result
+        self.state["failed"].pop(str(interview_id), None)
+        self._save()
+
+    def mark_failed(self, interview_id: int, error: str):
+        self.state["failed"][str(interview_id)] = error
+        self._save()
+
+def select_interviews(db, ids=None, since=None, until=None, role=None, limit=None):
+    """
+    Ids of the interviews to re-judge. Only interviews with persisted turns qualify.
+    """
+    has_turns = db.query(models.InterviewTurn.id).filter(models.InterviewTurn.interview_id == models.Interview.id).exists()
+    query = db.query(models.Interview.id).filter(has_turns)
+    if ids:
+        query = query.filter(models.Interview.id.in_(ids))
+    if since:
+        query = query.filter(models.Interview.created_at >= datetime.combine(since, datetime.min.time()))
+    if until:
+        query = query.filter(models.Interview.created_at < datetime.combine(until + timedelta(days=1), datetime.min.time()))
+    if role:
+        query = query.filter(models.Interview.job_role == role)
+    query = query.order_by(models.Interview.id)
+    if limit:
+        query = query.limit(limit)
+    return [row.id for row in query]
+
+class Rejudger:
+    """
+    Reruns InterviewJudge over historical interviews with at most `concurrency`
+    judge calls in flight. Calls still go through the LLM scheduler at judge priority;
+    a rejected call waits for its Retry-After and tries again.
+    """
+    def __init__(self, concurrency: int = 4):
+        self.concurrency = concurrency
+        self._local = threading.local()
+
+    def _judge(self):
+        # One judge (and LLM client) per worker thread
+        if not hasattr(self._local, "judge"):
+            self._local.judge = InterviewJudge()
+        return self._local.judge
+
+    def judge_one(self, interview_id: int):
+        db = session_local()
+        try:
+            turns = db.query(models.InterviewTurn).filter(models.InterviewTurn.interview_id == interview_id) \
+                .order_by(models.InterviewTurn.id).all()
+        finally:
+            db.close()
+
+        transcript, table = format_transcript(turns), score_table(turns)
+        start = time.perf_counter()
+        for attempt in range(MAX_ADMISSION_RETRIES + 1):
+            try:
+                report = self._judge().evaluate_interview(transcript, table)
+                break
+            except AdmissionRejected as e:
+                if attempt == MAX_ADMISSION_RETRIES:
+                    raise
+                time.sleep(e.retry_after)
+        return report, time.perf_counter() - start, estimate_tokens([transcript, table])
+
+    def run(self, interview_ids, checkpoint: RejudgeCheckpoint, dry_run: bool = False) -> dict:
+        todo = [i for i in interview_ids if not checkpoint.is_done(i)]
+        logging.info(f"Re-judging {len(todo)} interviews ({len(interview_ids) - len(todo)} already done), "
+                     f"concurrency {self.concurrency}")
+        latencies, tokens, shifts = [], 0, []
+        failed = 0
+        started = time.perf_counter()
+        db = session_local()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                futures = {pool.submit(self.judge_one, i): i for i in todo}
+                for n, future in enumerate(as_completed(futures), 1):
+                    interview_id = futures[future]
+                    try:
+                        report, seconds, used_tokens = future.result()
+                    except Exception as e:
+                        failed += 1
+                        if not dry_run:
+                            checkpoint.mark_failed(interview_id, str(e))
+                        logging.error(f"Re-judging interview {interview_id} failed: {e}")
+                        continue
+
+                    # Results are written from this thread only, SQLite has a single writer anyway
+                    interview = db.query(models.Interview).filter(models.Interview.id == interview_id).first()
+                    previous_score, previous_verdict = interview.score, interview.verdict
+                    if not dry_run:
+                        interview.score = report.get("score", 0)
+                        interview.verdict = report.get("verdict", "N/A")
+                        interview.feedback_summary = report.get("summary", "")
+                        rollups.record_outcome(db, interview, previous_score, previous_verdict)
+                        db.commit()
+
+                        # A dry run leaves the checkpoint alone, the real run still has everything to do
+                        checkpoint.mark_done(interview_id, {
+                            "previous_score": previous_score, "score": report.get("score"),
+                            "previous_verdict": previous_verdict, "verdict": report.get("verdict"),
+                        })
+                    latencies.append(seconds)
+                    tokens += used_tokens
+                    if previous_score is not None and report.get("score") is not None:
+                        shifts.append(float(report["score"]) - float(previous_score))
+
+                    if n % 10 == 0 or n == len(todo):
+                        elapsed = time.perf_counter() - started
+                        logging.info(f"Re-judged {n}/{len(todo)}, {n / elapsed * 60:.1f} interviews/min")
+        except Exception as e:
+            db.rollback()
+            raise ChatbotException(e, sys)
+        finally:
+            db.close()
+
+        elapsed = time.perf_counter() - started
+        return {
+            "judged": len(latencies),
+            "failed": failed,
+            "skipped": len(interview_ids) - len(todo),
+            "seconds": round(elapsed, 1),
+            "interviews_per_min": round(len(latencies) / elapsed * 60, 2) if elapsed else None,
+            "est_tokens_per_sec": round(tokens / elapsed, 1) if elapsed else None,
+            "latency_p50_s": round(float(np.percentile(latencies, 50)), 2) if latencies else None,
+            "latency_p95_s": round(float(np.percentile(latencies, 95)), 2) if latencies else None,
+            "mean_score_shift": round(float(np.mean(shifts)), 2) if shifts else None,
+            "dry_run": dry_run,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-run the judge over persisted interview transcripts")
+    parser.add_argument("--ids", type=int, nargs="*", help="interview ids, default all that match the filters")
+    parser.add_argument("--since", type=date.fromisoformat, help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--until", type=date.fromisoformat, help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--role")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--run-name", default="rejudge", help="checkpoint name, reuse it to resume a run")
+    parser.add_argument("--fresh", action="store_true", help="ignore the checkpoint of a previous run")
+    parser.add_argument("--dry-run", action="store_true", help="judge and report, but don't update interviews")
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=engine)
+    checkpoint = RejudgeCheckpoint(args.run_name)
+    if args.fresh:
+        checkpoint.state = {"done": {}, "failed": {}}
+
+    db = session_local()
+    try:
+        interview_ids = select_interviews(db, args.ids, args.since, args.until, args.role, args.limit)
+    finally:
+        db.close()
+
+    summary = Rejudger(args.concurrency).run(interview_ids, checkpoint, dry_run=args.dry_run)
+    print(json.dumps(summary, indent=2))
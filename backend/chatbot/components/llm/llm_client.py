@@ -0,0 +1,21 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LLM_REPO_ID = "meta-llama/Llama-3.1-8B-Instruct"
+
+def build_chat_model(temperature: float = 0.4):
+    """
+    Builds the chat model used by the interviewer and the judge. langchain_huggingface
+    pulls in transformers, so it is imported here rather than at module import time.
+    """
+    from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+
+    llm = HuggingFaceEndpoint(
+        repo_id=LLM_REPO_ID,
+        huggingfacehub_api_token=os.getenv("HUGGINGFACE_HUB_ACCESS_KEY"),
+        task="text-generation",
+        temperature=temperature
+    )
+    return ChatHuggingFace(llm=llm)
@@ -0,0 +1,160 @@
+import os, time, heapq, itertools, threading
+from contextlib import contextmanager
+from enum import IntEnum
+
+from chatbot.components.src_logging.logger import logging
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "60000"))
+# Generation budget added to the prompt estimate of every call
+LLM_MAX_NEW_TOKENS = int(os.getenv("LLM_MAX_NEW_TOKENS", "512"))
+# Every queued call holds a threadpool thread while it waits. Running plus queued
+# calls must stay well under anyio's default of 40 threadpool tokens, or sync routes
+# (/health/ready) and other run_in_threadpool users starve under load.
+LLM_MAX_QUEUED = int(os.getenv("LLM_MAX_QUEUED", "24"))
+
+class Priority(IntEnum):
+    CHAT = 0    # turns of interviews already in progress
+    START = 1   # first turn of a new interview
+    JUDGE = 2   # feedback / re-judging
+
+# Longest a call of each class may wait in the queue before it is rejected with a 429
+MAX_QUEUE_WAIT = {
+    Priority.CHAT: float(os.getenv("LLM_MAX_WAIT_CHAT", "30")),
+    Priority.START: float(os.getenv("LLM_MAX_WAIT_START", "10")),
+    Priority.JUDGE: float(os.getenv("LLM_MAX_WAIT_JUDGE", "60")),
+}
+
+class AdmissionRejected(Exception):
+    def __init__(self, priority: Priority, retry_after: float):
+        self.priority = priority
+        self.retry_after = max(1, int(retry_after + 0.999))
+        super().__init__(f"LLM overloaded, {priority.name.lower()} call rejected, retry after {self.retry_after}s")
+
+def estimate_tokens(messages) -> int:
+    """
+    Rough prompt size (~4 chars per token) plus the generation budget.
+    """
+    chars = sum(len(getattr(m, "content", m)) for m in messages)
+    return chars // 4 + LLM_MAX_NEW_TOKENS
+
+class LLMScheduler:
+    """
+    Global admission control in front of the HuggingFace endpoint.
+
+    At most `max_concurrency` calls run at once and the estimated token usage is
+    held under `tokens_per_minute` with a token bucket. Waiting calls are served by
+    priority class, then arrival order. A call whose predicted queue wait already
+    exceeds its class deadline is rejected immediately, and one that is still
+    queued when the deadline passes is rejected then, so callers get a fast 429
+    instead of an unbounded wait.
+
+    At most `max_queued` calls wait at once. When the queue is full, a call evicts
+    the least urgent waiter if it is more urgent itself, and is rejected otherwise.
+    """
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+                 max_queued: int = LLM_MAX_QUEUED):
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self.capacity = tokens_per_minute
+        self.refill_rate = tokens_per_minute / 60.0
+        self.tokens = float(tokens_per_minute)
+        self._last_refill = time.monotonic()
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._evicted = set()
+        self._seq = itertools.count()
+        self.running = 0
+        # Moving average of call duration, used to predict queue wait
+        self.avg_service_s = 5.0
+        self.stats = {p.name.lower(): {"admitted": 0, "rejected": 0} for p in Priority}
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.refill_rate)
+        self._last_refill = now
+
+    def _predicted_wait(self, priority, tokens):
+        ahead = sum(1 for p, _, _ in self._queue if p <= priority) + max(0, self.running - self.max_concurrency + 1)
+        slot_wait = ahead * self.avg_service_s / self.max_concurrency
+        token_wait = max(0.0, tokens - self.tokens) / self.refill_rate
+        return max(slot_wait, token_wait)
+
+    @contextmanager
+    def acquire(self, priority: Priority, tokens: int):
+        tokens = min(tokens, self.capacity)
+        deadline = time.monotonic() + MAX_QUEUE_WAIT[priority]
+        name = priority.name.lower()
+
+        with self._cond:
+            self._refill()
+            predicted = self._predicted_wait(priority, tokens)
+            if predicted > MAX_QUEUE_WAIT[priority]:
+                self.stats[name]["rejected"] += 1
+                logging.warning(f"Rejected {name} LLM call up front, predicted wait {predicted:.1f}s")
+                raise AdmissionRejected(priority, predicted)
+
+            if len(self._queue) >= self.max_queued:
+                least_urgent = max(self._queue)
+                if least_urgent[0] <= priority:
+                    self.stats[name]["rejected"] += 1
+                    logging.warning(f"Rejected {name} LLM call, {len(self._queue)} calls already queued")
+                    raise AdmissionRejected(priority, predicted)
+                self._queue.remove(least_urgent)
+                heapq.heapify(self._queue)
+                self._evicted.add(least_urgent[1])
+                self._cond.notify_all()
+
+            entry = (priority, next(self._seq), tokens)
+            heapq.heappush(self._queue, entry)
+            while True:
+                if entry[1] in self._evicted:
+                    self._evicted.discard(entry[1])
+                    self.stats[name]["rejected"] += 1
+                    logging.warning(f"Evicted queued {name} LLM call for a more urgent one")
+                    raise AdmissionRejected(priority, self._predicted_wait(priority, tokens))
+                self._refill()
+                if self._queue[0] is entry and self.running < self.max_concurrency and self.tokens >= tokens:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                    self.stats[name]["rejected"] += 1
+                    logging.warning(f"Rejected {name} LLM call after waiting {MAX_QUEUE_WAIT[priority]}s in queue")
+                    raise AdmissionRejected(priority, self._predicted_wait(priority, tokens))
+                # Wake up at least when enough tokens should have refilled
+                token_wait = max(0.0, tokens - self.tokens) / self.refill_rate
+                self._cond.wait(timeout=min(remaining, max(token_wait, 0.05)))
+
+            heapq.heappop(self._queue)
+            self.running += 1
+            self.tokens -= tokens
+            self.stats[name]["admitted"] += 1
+            # The next queued call may be admissible too
+            self._cond.notify_all()
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.running -= 1
+                self.avg_service_s = 0.8 * self.avg_service_s + 0.2 * (time.monotonic() - start)
+                self._cond.notify_all()
+
+    def report(self):
+        with self._cond:
+            self._refill()
+            return {
+                "running": self.running,
+                "queued": len(self._queue),
+                "max_queued": self.max_queued,
+                "tokens_available": int(self.tokens),
+                "avg_service_s": round(self.avg_service_s, 2),
+                "by_priority": {name: dict(counts) for name, counts in self.stats.items()},
+            }
+
+llm_scheduler = LLMScheduler()
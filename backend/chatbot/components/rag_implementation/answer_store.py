@@ -0,0 +1,49 @@
+import os, sqlite3, threading
+from typing import List, Dict, Optional
+
+from chatbot.components.src_logging.logger import logging
+
+ANSWER_STORE_PATH = os.getenv("ANSWER_STORE_PATH", os.path.join("artifacts", "answer_store.db"))
+
+class AnswerStore:
+    """
+    Local key-value store of question/answer text keyed by vector id.
+
+    The remote index only keeps ids and small metadata, retrieval fetches
+    ids and scores and the text of the one selected question is resolved
+    here, so the answers of the other k-1 matches never cross the network.
+    """
+    def __init__(self, path: str = ANSWER_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "id TEXT PRIMARY KEY, question TEXT NOT NULL, answer TEXT, source TEXT)"
+            )
+            self._conn.commit()
+
+    def put_many(self, records: List[Dict]):
+        """
+        records: [{"id", "question", "answer", "source"}, ...], existing ids are overwritten.
+        """
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO answers (id, question, answer, source) "
+                "VALUES (:id, :question, :answer, :source)",
+                records
+            )
+            self._conn.commit()
+        logging.info(f"Stored {len(records)} answers in {self.path}")
+
+    def get(self, doc_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT question, answer, source FROM answers WHERE id = ?", (doc_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"id": doc_id, "question": row[0], "answer": row[1], "source": row[2]}
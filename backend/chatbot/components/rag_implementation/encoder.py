@@ -0,0 +1,187 @@
+import os, sys, json, time, argparse, subprocess, resource
+from functools import lru_cache
+from typing import List
+import numpy as np
+
+from chatbot.components.src_logging.logger import logging
+from chatbot.components.exception.exception import ChatbotException
+
+MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+MAX_SEQ_LENGTH = 384
+
+# "huggingface" (torch, the default) or "onnx" (exported int8 graph on onnxruntime)
+QUERY_ENCODER = os.getenv("QUERY_ENCODER", "huggingface")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join("artifacts", "onnx_encoder"))
+# Minimum cosine similarity between ONNX and reference vectors for the export to be usable
+COSINE_TOLERANCE = float(os.getenv("ONNX_COSINE_TOLERANCE", "0.99"))
+
+SAMPLE_QUERIES = [
+    "Data Science interview questions", "Statistics concepts", "Machine Learning advanced",
+    "Deep Learning basic", "SQL sql queries", "Coding coding",
+    "Explain the bias variance tradeoff", "What is a window function in SQL?",
+]
+
+class OnnxQueryEncoder:
+    """
+    CPU query encoder running the exported, int8 quantized mpnet graph on onnxruntime.
+    Reproduces the sentence-transformers pipeline (mean pooling + L2 normalisation)
+    and exposes the same embed_query / embed_documents interface as HuggingFaceEmbeddings,
+    without importing torch.
+    """
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id("<pad>"), pad_token="<pad>")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, "model.int8.onnx"), options, providers=["CPUExecutionProvider"]
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        hidden = self.session.run(None, {"input_ids": input_ids, "attention_mask": attention_mask})[0]
+
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.linalg.norm(pooled, axis=1, keepdims=True) + 1e-12
+        return pooled.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+def _huggingface_encoder():
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=MODEL_NAME)
+
+def _onnx_verified(model_dir: str) -> bool:
+    path = os.path.join(model_dir, "verification.json")
+    if not os.path.exists(path):
+        return False
+    with open(path, "r") as f:
+        return json.load(f).get("passed", False)
+
+@lru_cache(maxsize=None)
+def get_query_encoder(backend: str = QUERY_ENCODER):
+    """
+    Returns the process wide query encoder, loaded once and shared by every RagEngine.
+    The ONNX backend is only used if its export passed the cosine verification.
+    """
+    try:
+        if backend == "onnx":
+            if _onnx_verified(ONNX_MODEL_DIR):
+                logging.info(f"Using ONNX int8 query encoder from {ONNX_MODEL_DIR}")
+                return OnnxQueryEncoder(ONNX_MODEL_DIR)
+            logging.warning(f"No verified ONNX encoder in {ONNX_MODEL_DIR}, falling back to {MODEL_NAME}")
+        return _huggingface_encoder()
+    except Exception as e:
+        raise ChatbotException(e, sys)
+
+def export_onnx(output_dir: str = ONNX_MODEL_DIR):
+    """
+    Exports the mpnet transformer to ONNX, quantizes its weights to int8 and
+    saves the tokenizer next to it. Needs torch/transformers, the server doesn't.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    model = AutoModel.from_pretrained(MODEL_NAME).eval()
+
+    sample = tokenizer(SAMPLE_QUERIES[:2], padding=True, return_tensors="pt")
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=14,
+        )
+    quantize_dynamic(fp32_path, os.path.join(output_dir, "model.int8.onnx"), weight_type=QuantType.QInt8)
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, "tokenizer.json"))
+    logging.info(f"Exported int8 ONNX encoder to {output_dir}")
+
+def verify(output_dir: str = ONNX_MODEL_DIR, tolerance: float = COSINE_TOLERANCE) -> dict:
+    """
+    Compares ONNX and reference vectors for the sample queries and records the result,
+    get_query_encoder() refuses exports that didn't pass.
+    """
+    reference = np.asarray(_huggingface_encoder().embed_documents(SAMPLE_QUERIES))
+    candidate = np.asarray(OnnxQueryEncoder(output_dir).embed_documents(SAMPLE_QUERIES))
+
+    cosine = (reference * candidate).sum(axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    )
+    result = {
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "tolerance": tolerance,
+        "passed": bool(cosine.min() >= tolerance),
+    }
+    with open(os.path.join(output_dir, "verification.json"), "w") as f:
+        json.dump(result, f, indent=2)
+    logging.info(f"ONNX encoder verification: {result}")
+    return result
+
+def benchmark(backend: str, runs: int = 100) -> dict:
+    """
+    Cold start, per-query latency and peak memory of one backend. Meant to run
+    in a fresh process (see `compare`) so imports and memory aren't shared.
+    """
+    start = time.perf_counter()
+    encoder = OnnxQueryEncoder() if backend == "onnx" else _huggingface_encoder()
+    encoder.embed_query(SAMPLE_QUERIES[0])
+    cold_start = time.perf_counter() - start
+
+    latencies = []
+    for i in range(runs):
+        t = time.perf_counter()
+        encoder.embed_query(SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)])
+        latencies.append((time.perf_counter() - t) * 1000)
+
+    return {
+        "backend": backend,
+        "cold_start_s": round(cold_start, 2),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        # ru_maxrss is in KB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export, verify and benchmark the ONNX query encoder")
+    parser.add_argument("command", choices=["export", "verify", "benchmark", "compare"])
+    parser.add_argument("--backend", default="onnx", choices=["onnx", "huggingface"])
+    parser.add_argument("--output-dir", default=ONNX_MODEL_DIR)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_onnx(args.output_dir)
+        print(json.dumps(verify(args.output_dir), indent=2))
+    elif args.command == "verify":
+        print(json.dumps(verify(args.output_dir), indent=2))
+    elif args.command == "benchmark":
+        print(json.dumps(benchmark(args.backend)))
+    else:
+        for backend in ("huggingface", "onnx"):
+            out = subprocess.run(
+                [sys.executable, "-m", "chatbot.components.rag_implementation.encoder", "benchmark", "--backend", backend],
+                capture_output=True, text=True, check=True
+            ).stdout
+            print(out.strip().splitlines()[-1])
@@ -0,0 +1,198 @@
+import os, argparse
+import numpy as np
+
+# Rows upcast per matmul, small enough for the float32 copy to stay in cache
+SCAN_CHUNK = 256
+
+class Float32Index:
+    """
+    Exact full precision scan, also the reference the quantized modes are measured against.
+    """
+    mode = "float32"
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def scores(self, query, rows=None):
+        data = self.vectors if rows is None else self.vectors[rows]
+        return data @ query
+
+    @property
+    def nbytes(self):
+        # A full scan pages in the whole memory map
+        return self.vectors.nbytes
+
+class Float16Index:
+    mode = "float16"
+
+    def __init__(self, codes):
+        self.codes = codes
+
+    @classmethod
+    def build(cls, vectors):
+        return cls(np.asarray(vectors, dtype=np.float16))
+
+    def scores(self, query, rows=None):
+        data = self.codes if rows is None else self.codes[rows]
+        out = np.empty(len(data), dtype=np.float32)
+        # numpy has no BLAS path for float16, upcast chunk by chunk
+        for start in range(0, len(data), SCAN_CHUNK):
+            out[start:start + SCAN_CHUNK] = data[start:start + SCAN_CHUNK].astype(np.float32) @ query
+        return out
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
+
+class Int8Index:
+    """
+    Symmetric per-dimension int8 quantization: x ~= codes * scales.
+    """
+    mode = "int8"
+
+    def __init__(self, codes, scales):
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def build(cls, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        scales = np.abs(vectors).max(axis=0) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales), -127, 127).astype(np.int8)
+        return cls(codes, scales.astype(np.float32))
+
+    def scores(self, query, rows=None):
+        # Fold the scales into the query once instead of dequantizing every row
+        scaled_query = query * self.scales
+        data = self.codes if rows is None else self.codes[rows]
+        out = np.empty(len(data), dtype=np.float32)
+        for start in range(0, len(data), SCAN_CHUNK):
+            out[start:start + SCAN_CHUNK] = data[start:start + SCAN_CHUNK].astype(np.float32) @ scaled_query
+        return out
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.scales.nbytes
+
+class PQIndex:
+    """
+    Product quantization: the vector is split into `subspaces` chunks, each chunk is
+    replaced by the id of its nearest of 256 k-means centroids. Scoring uses a
+    per-query lookup table (asymmetric distance computation).
+    """
+    mode = "pq"
+
+    def __init__(self, codes, codebooks):
+        self.codes = codes              # (N, m) uint8
+        self.codebooks = codebooks      # (m, 256, dim // m) float32
+
+    @classmethod
+    def build(cls, vectors, subspaces: int = 48, iterations: int = 15, seed: int = 42):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n, dim = vectors.shape
+        if dim % subspaces != 0:
+            raise ValueError(f"dimension {dim} is not divisible by {subspaces} subspaces")
+
+        sub_dim = dim // subspaces
+        n_centroids = min(256, n)
+        rng = np.random.RandomState(seed)
+
+        codebooks = np.zeros((subspaces, 256, sub_dim), dtype=np.float32)
+        codes = np.zeros((n, subspaces), dtype=np.uint8)
+        for m in range(subspaces):
+            sub = vectors[:, m * sub_dim:(m + 1) * sub_dim]
+            centroids = sub[rng.choice(n, n_centroids, replace=False)].copy()
+            for _ in range(iterations):
+                distances = (sub ** 2).sum(1)[:, None] - 2 * sub @ centroids.T + (centroids ** 2).sum(1)[None, :]
+                labels = distances.argmin(axis=1)
+                counts = np.bincount(labels, minlength=n_centroids)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, sub)
+                filled = counts > 0
+                centroids[filled] = sums[filled] / counts[filled, None]
+            codebooks[m, :n_centroids] = centroids
+            codes[:, m] = labels
+        return cls(codes, codebooks)
+
+    def scores(self, query, rows=None):
+        subspaces, _, sub_dim = self.codebooks.shape
+        lut = np.einsum("mcd,md->mc", self.codebooks, query.reshape(subspaces, sub_dim))
+        data = self.codes if rows is None else self.codes[rows]
+        return lut[np.arange(subspaces), data].sum(axis=1)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.codebooks.nbytes
+
+def write_quantized(path: str, vectors, pq_subspaces: int = 0):
+    """
+    Stores the quantized forms of a snapshot's embeddings next to embeddings.npy.
+    """
+    int8 = Int8Index.build(vectors)
+    np.save(os.path.join(path, "embeddings.int8.npy"), int8.codes)
+    np.save(os.path.join(path, "embeddings.int8_scales.npy"), int8.scales)
+    np.save(os.path.join(path, "embeddings.f16.npy"), Float16Index.build(vectors).codes)
+
+    if pq_subspaces:
+        pq = PQIndex.build(vectors, subspaces=pq_subspaces)
+        np.save(os.path.join(path, "embeddings.pq_codes.npy"), pq.codes)
+        np.save(os.path.join(path, "embeddings.pq_codebooks.npy"), pq.codebooks)
+
+def load_index(path: str, mode: str, vectors):
+    """
+    Loads the scan index of a snapshot in the requested mode. Falls back to the
+    float32 vectors when the snapshot was written without that quantized form.
+    """
+    def file(name):
+        return os.path.join(path, f"embeddings.{name}.npy")
+
+    if mode == "int8" and os.path.exists(file("int8")):
+        return Int8Index(np.load(file("int8")), np.load(file("int8_scales")))
+    if mode == "float16" and os.path.exists(file("f16")):
+        return Float16Index(np.load(file("f16")))
+    if mode == "pq" and os.path.exists(file("pq_codes")):
+        return PQIndex(np.load(file("pq_codes")), np.load(file("pq_codebooks")))
+    return Float32Index(vectors)
+
+def recall_at_k(snapshot, queries, k: int = 7):
+    """
+    Fraction of the exact float32 top-k that the snapshot's configured index returns.
+    """
+    exact = Float32Index(snapshot.embeddings)
+    hits = 0
+    for query in queries:
+        query = query / (np.linalg.norm(query) + 1e-12)
+        truth = set(np.argsort(-exact.scores(query))[:k])
+        found = {row for row, _ in snapshot.search(query, k=k)}
+        hits += len(truth & found)
+    return hits / (k * len(queries))
+
+if __name__ == "__main__":
+    import time
+    from chatbot.components.rag_implementation.snapshot import QuestionBankSnapshot
+
+    parser = argparse.ArgumentParser(description="Report recall@k, memory and scan latency of each quantized mode")
+    parser.add_argument("snapshot", help="path to a snapshot version directory")
+    parser.add_argument("--k", type=int, default=7)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    # Perturbed stored vectors stand in for real queries
+    base = QuestionBankSnapshot(args.snapshot, mode="float32")
+    rng = np.random.RandomState(0)
+    picks = rng.choice(len(base), min(args.queries, len(base)), replace=False)
+    queries = np.asarray(base.embeddings[picks]) + rng.normal(0, 0.05, (len(picks), base.embeddings.shape[1]))
+
+    print(f"{'mode':<8} {'rescore':>7} {'recall@k':>9} {'resident MB':>12} {'ms/query':>9}")
+    for mode in ("float32", "float16", "int8", "pq"):
+        for rescore in (0, 50):
+            snapshot = QuestionBankSnapshot(args.snapshot, mode=mode, rescore=rescore)
+            if snapshot.index.mode != mode:
+                continue
+            recall = recall_at_k(snapshot, queries, k=args.k)
+            start = time.perf_counter()
+            for query in queries:
+                snapshot.search(query, k=args.k)
+            elapsed = (time.perf_counter() - start) / len(queries) * 1000
+            print(f"{mode:<8} {rescore:>7} {recall:>9.3f} {snapshot.index.nbytes / 2**20:>12.2f} {elapsed:>9.2f}")
@@ -1,48 +1,177 @@
-import os, sys
+import os, sys, threading
 from dotenv import load_dotenv
-from pinecone import Pinecone
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_pinecone import PineconeVectorStore
 import random
+import numpy as np
 
 from chatbot.components.src_logging.logger import logging
 from chatbot.components.exception.exception import ChatbotException
+from chatbot.components.rag_implementation.snapshot import snapshot_manager
+from chatbot.components.rag_implementation.answer_store import AnswerStore
+from chatbot.components.rag_implementation.topics import TOPICS
+from chatbot.components.rag_implementation.encoder import get_query_encoder
 
 load_dotenv()
 
 INDEX_NAME = os.getenv("INDEX_NAME")
+# Returned in place of the reference answer when the store has none
+MISSING_ANSWER = "Answer not found in DB."
+# Share of the resume vector in the retrieval query, 0 ignores the resume
+RESUME_BLEND_WEIGHT = float(os.getenv("RESUME_BLEND_WEIGHT", "0.3"))
+RESUME_CHUNK_CHARS = 1000
+RESUME_MAX_CHUNKS = 16
+# Suffixes added to the topic to vary the retrieval query
+QUERY_VARIATIONS = ["interview questions", "concepts", "advanced", "basic", "coding", "sql queries"]
+
+# Topic query strings come from a small fixed set, so their vectors are embedded once per process
+_query_vectors = {}
+_query_vectors_lock = threading.Lock()
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / (np.linalg.norm(vector) + 1e-12)
+
+def query_vector(encoder, query: str) -> np.ndarray:
+    vector = _query_vectors.get(query)
+    if vector is None:
+        vector = _unit(encoder.embed_query(query))
+        vector.setflags(write=False)
+        with _query_vectors_lock:
+            _query_vectors[query] = vector
+    return vector
+
+def warm_query_vectors(encoder) -> int:
+    """
+    Embeds every topic query retrieval can issue in one batch.
+    """
+    queries = [f"{topic} {variation}" for topic in TOPICS for variation in QUERY_VARIATIONS]
+    missing = [q for q in queries if q not in _query_vectors]
+    if missing:
+        for query, vector in zip(missing, encoder.embed_documents(missing)):
+            vector = _unit(vector)
+            vector.setflags(write=False)
+            with _query_vectors_lock:
+                _query_vectors[query] = vector
+    return len(queries)
+
+def embed_resume(encoder, resume_text: str):
+    """
+    One unit vector for the whole resume: the mean of its chunk embeddings, since
+    the encoder truncates long inputs. Computed once per session at /start.
+    """
+    chunks, current = [], ""
+    for paragraph in resume_text.split("\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) > RESUME_CHUNK_CHARS:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    if not chunks:
+        return None
+
+    vectors = np.asarray(encoder.embed_documents(chunks[:RESUME_MAX_CHUNKS]), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+    return _unit(vectors.mean(axis=0))
+
+def blend_query(topic_vector, resume_vector, weight: float = RESUME_BLEND_WEIGHT) -> np.ndarray:
+    if resume_vector is None or weight <= 0:
+        return topic_vector
+    return _unit((1 - weight) * topic_vector + weight * resume_vector)
 
 class RagEngine:
-    def __init__(self):
-        self.pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-        self.index = self.pc.Index(INDEX_NAME)
-        self.embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-mpnet-base-v2")
-        self.vector_store = PineconeVectorStore(index_name=INDEX_NAME, embedding=self.embeddings)
+    def __init__(self, index=None, snapshots=None, encoder=None, answer_store=None):
+        # Every backend can be passed in, e.g. offline fakes for benchmarks
+        if index is None:
+            from pinecone import Pinecone  # heavy, only needed once a session starts
+            self.pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+            index = self.pc.Index(INDEX_NAME)
+        self.index = index
+        self.snapshots = snapshots or snapshot_manager
+        # Shared across sessions, the model is only loaded once per process
+        self.embeddings = encoder or get_query_encoder()
+        self.answer_store = answer_store or AnswerStore()
+        # Stored embedding of the last retrieved question, when the backend has it at hand
+        self.last_question_vector = None
         logging.info("RAG Engine initialized successfully.")
     
-    def get_interview_question(self, topic="Data Science"):
+    def embed_resume(self, resume_text):
+        return embed_resume(self.embeddings, resume_text) if resume_text else None
+
+    def get_interview_question(self, topic="Data Science", resume_vector=None):
         """
         Retrieves a question based on some topic related to data science, but
         introduces randomness to avoid repetition of the same questions everytime.
+        If topic is one of TOPICS only that topic's partition is searched.
+        With a resume vector, the query is pulled towards the candidate's background.
         """
+        self.last_question_vector = None
         try:
             """
             Variation introduces randomness to the query which can fetch us diverse queries
             from search results.
             """
-            variations = ["interview questions", "concepts", "advanced", "basic", "coding", "sql queries"]
-            query = f"{topic} {random.choice(variations)}"
+            query = f"{topic} {random.choice(QUERY_VARIATIONS)}"
+            partition = topic if topic in TOPICS else None
+            # Cached topic vector blended with the session's resume vector, no embedding call per turn
+            vector = blend_query(query_vector(self.embeddings, query), resume_vector)
 
-            results = self.vector_store.similarity_search(query, k=7)
+            # Serve from the local snapshot when one is loaded, the remote index is the fallback
+            snapshot = self.snapshots.current()
+            if snapshot is not None:
+                try:
+                    return self._search_snapshot(snapshot, vector, partition)
+                except Exception as e:
+                    logging.warning(f"Snapshot {snapshot.version} search failed, using remote index: {e}")
 
-            if not results:
-                return None, None
-            
-            selected_doc = random.choice(results)
+            return self._search_remote(vector, partition)
+        except Exception as e:
+            raise ChatbotException(e, sys)
 
-            question_text = selected_doc.page_content
-            answer_text = selected_doc.metadata.get("answer", "Answer not found in DB.")
+    def _search_snapshot(self, snapshot, vector, partition=None):
+        results = snapshot.search(vector, k=7, topic=partition)
+        if not results:
+            return None, None
 
-            return question_text, answer_text
-        except Exception as e:
-            raise ChatbotException(e, sys)
\ No newline at end of file
+        row, _ = random.choice(results)
+        record = snapshot.get(row)
+        self.last_question_vector = np.asarray(snapshot.embeddings[row], dtype=np.float32)
+        return record["question"], record["answer"] or MISSING_ANSWER
+
+    def _search_remote(self, vector, partition=None):
+        # Ask only for ids and scores, the text of the selected match is resolved locally
+        vector = vector.tolist()
+        matches = []
+        if partition:
+            matches = self.index.query(
+                vector=vector,
+                top_k=7,
+                filter={"topic": {"$eq": partition}},
+                include_values=False,
+                include_metadata=False
+            ).matches
+
+        # Indexes ingested before topic tagging have no partitions
+        if not matches:
+            matches = self.index.query(
+                vector=vector,
+                top_k=7,
+                include_values=False,
+                include_metadata=False
+            ).matches
+
+        if not matches:
+            return None, None
+        
+        selected = random.choice(matches)
+        record = self.answer_store.get(selected.id)
+
+        if record is None:
+            # Indexes ingested before the answer store kept the text in metadata
+            fetched = self.index.fetch(ids=[selected.id]).vectors.get(selected.id)
+            metadata = fetched.metadata if fetched else {}
+            return metadata.get("text"), metadata.get("answer", MISSING_ANSWER)
+
+        return record["question"], record["answer"] or MISSING_ANSWER
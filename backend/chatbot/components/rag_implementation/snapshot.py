@@ -0,0 +1,197 @@
+import os, sys, json, shutil, threading
+from datetime import datetime
+from typing import List, Dict, Optional
+import numpy as np
+import pyarrow as pa
+
+from chatbot.components.src_logging.logger import logging
+from chatbot.components.exception.exception import ChatbotException
+from chatbot.components.rag_implementation.quantization import write_quantized, load_index
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join("artifacts", "snapshots"))
+LATEST_POINTER = "LATEST"
+# Scan index held in memory (float32 | float16 | int8 | pq), and how many of its top
+# candidates are rescored against the memory mapped float32 vectors
+SNAPSHOT_INDEX_MODE = os.getenv("SNAPSHOT_INDEX_MODE", "int8")
+SNAPSHOT_RESCORE = int(os.getenv("SNAPSHOT_RESCORE", "50"))
+
+def write_snapshot(records: List[Dict], embeddings: np.ndarray, ids: List[str], root: str = SNAPSHOT_DIR,
+                   pq_subspaces: int = 0) -> str:
+    """
+    Writes an immutable, versioned question bank snapshot and points LATEST at it.
+
+    <root>/<version>/questions.arrow   Arrow IPC file with the id/question/answer/source/topic columns
+    <root>/<version>/embeddings.npy    (N, dim) float32 unit vectors, row aligned with questions.arrow
+    <root>/<version>/embeddings.*.npy  int8 / float16 (and optionally product quantized) copies
+    <root>/<version>/manifest.json
+    """
+    # Microseconds keep two writes in the same second apart, and the names still sort by time
+    version = datetime.utcnow().strftime("v%Y%m%d%H%M%S%f")
+    final_dir = os.path.join(root, version)
+    # Per process, so concurrent writers never share a staging directory
+    tmp_dir = f"{final_dir}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(tmp_dir)
+
+        table = pa.table({
+            "id": pa.array(ids, type=pa.string()),
+            "question": pa.array([r["text"] for r in records], type=pa.string()),
+            "answer": pa.array([r["metadata"].get("answer", "") for r in records], type=pa.string()),
+            "source": pa.array([r["metadata"].get("source", "") for r in records], type=pa.string()),
+            "sources": pa.array([r["metadata"].get("sources", []) for r in records], type=pa.list_(pa.string())),
+            "topic": pa.array([r["metadata"].get("topic", "") for r in records], type=pa.string()),
+        })
+        with pa.OSFile(os.path.join(tmp_dir, "questions.arrow"), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        np.save(os.path.join(tmp_dir, "embeddings.npy"), vectors)
+        write_quantized(tmp_dir, vectors, pq_subspaces=pq_subspaces)
+
+        with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+            json.dump({
+                "version": version,
+                "count": len(records),
+                "dimension": int(vectors.shape[1]),
+                "created_at": datetime.utcnow().isoformat()
+            }, f)
+
+        # Rename is atomic, readers never see a half written version directory
+        os.replace(tmp_dir, final_dir)
+
+        pointer_tmp = os.path.join(root, f"{LATEST_POINTER}.{version}.tmp")
+        with open(pointer_tmp, "w") as f:
+            f.write(version)
+        os.replace(pointer_tmp, os.path.join(root, LATEST_POINTER))
+
+        logging.info(f"Wrote question bank snapshot {version} with {len(records)} questions")
+        return version
+    except Exception as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise ChatbotException(e, sys)
+
+class QuestionBankSnapshot:
+    """
+    A read-only question bank backed by memory mapped files. Only the pages
+    that are actually touched get read from disk, text columns stay zero-copy
+    in Arrow until a single selected row is converted to Python.
+
+    Searches scan a compact quantized copy of the embeddings held in memory and
+    rescore the top candidates against the float32 vectors to recover exact ranking.
+    """
+    def __init__(self, path: str, mode: str = SNAPSHOT_INDEX_MODE, rescore: int = SNAPSHOT_RESCORE):
+        self.path = path
+        with open(os.path.join(path, "manifest.json"), "r") as f:
+            self.manifest = json.load(f)
+        self.version = self.manifest["version"]
+
+        source = pa.memory_map(os.path.join(path, "questions.arrow"), "r")
+        self.table = pa.ipc.open_file(source).read_all()
+        self.embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        self.index = load_index(path, mode, self.embeddings)
+        self.rescore = rescore
+
+        if self.table.num_rows != self.embeddings.shape[0]:
+            raise ValueError(f"Snapshot {self.version} is inconsistent: "
+                             f"{self.table.num_rows} rows vs {self.embeddings.shape[0]} vectors")
+
+        # Row ids of every topic partition, older snapshots without topics have none
+        self.partitions = {}
+        if "topic" in self.table.column_names:
+            topics = np.asarray(self.table.column("topic").to_pylist())
+            self.partitions = {str(name): np.flatnonzero(topics == name) for name in np.unique(topics) if name}
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def search(self, query_vector, k: int = 7, topic: str = None):
+        """
+        Returns [(row, score), ...] of the k most similar questions by cosine similarity.
+        With a topic, only the rows of that topic partition are scanned.
+        """
+        query = np.asarray(query_vector, dtype=np.float32)
+        # Not in place, callers may pass cached vectors
+        query = query / (np.linalg.norm(query) + 1e-12)
+
+        rows = self.partitions.get(topic) if topic else None
+        scores = self.index.scores(query, rows)
+        if len(scores) == 0:
+            return []
+
+        exact = self.index.mode == "float32"
+        n_candidates = min(k if exact else max(k, self.rescore), len(scores))
+        top = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+        candidate_rows = top if rows is None else rows[top]
+        candidate_scores = scores[top]
+
+        if not exact and self.rescore:
+            # Rescoring only touches the candidate rows of the float32 memory map
+            candidate_scores = np.asarray(self.embeddings[candidate_rows]) @ query
+
+        order = np.argsort(-candidate_scores)[:k]
+        return [(int(candidate_rows[i]), float(candidate_scores[i])) for i in order]
+
+    def get(self, row: int) -> Dict:
+        return {
+            "id": self.table.column("id")[row].as_py(),
+            "question": self.table.column("question")[row].as_py(),
+            "answer": self.table.column("answer")[row].as_py(),
+            "source": self.table.column("source")[row].as_py(),
+            "topic": self.table.column("topic")[row].as_py() if "topic" in self.table.column_names else None,
+        }
+
+class SnapshotManager:
+    """
+    Holds the snapshot that retrieval reads from. swap() loads and validates the
+    new version first and only then replaces the reference, so in-flight queries
+    finish on the old snapshot and active sessions are never interrupted.
+    """
+    def __init__(self, root: str = SNAPSHOT_DIR):
+        self.root = root
+        self._current: Optional[QuestionBankSnapshot] = None
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[QuestionBankSnapshot]:
+        return self._current
+
+    def available_versions(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if not name.endswith(".tmp") and os.path.exists(os.path.join(self.root, name, "manifest.json"))
+        )
+
+    def latest_version(self) -> Optional[str]:
+        pointer = os.path.join(self.root, LATEST_POINTER)
+        if os.path.exists(pointer):
+            with open(pointer, "r") as f:
+                return f.read().strip()
+        versions = self.available_versions()
+        return versions[-1] if versions else None
+
+    def swap(self, version: Optional[str] = None) -> QuestionBankSnapshot:
+        version = version or self.latest_version()
+        if version not in self.available_versions():
+            raise FileNotFoundError(f"Snapshot version '{version}' not found in {self.root}")
+
+        snapshot = QuestionBankSnapshot(os.path.join(self.root, version))
+        with self._lock:
+            previous = self._current
+            self._current = snapshot
+
+        logging.info(f"Question bank snapshot swapped {previous.version if previous else None} -> {version}")
+        return snapshot
+
+    def load_latest(self) -> Optional[QuestionBankSnapshot]:
+        """
+        Called on startup, falls back to the remote index when no snapshot exists.
+        """
+        if not self.latest_version():
+            logging.warning(f"No question bank snapshot in {self.root}, retrieval will use the remote index")
+            return None
+        return self.swap()
+
+snapshot_manager = SnapshotManager()
@@ -0,0 +1,82 @@
+import os
+import numpy as np
+from typing import List, Dict
+
+# Topics the interviewer must cover, with a short description used as the seed
+# centroid for nearest-centroid tagging of the question bank
+TOPICS: Dict[str, str] = {
+    "Statistics": "statistics probability distributions hypothesis testing p-value confidence interval sampling bayes variance",
+    "Machine Learning": "machine learning regression classification decision trees random forest overfitting bias variance cross validation feature engineering",
+    "Deep Learning": "deep learning neural networks backpropagation cnn rnn transformers activation functions gradient descent dropout",
+    "SQL": "sql query database joins group by window functions aggregation subqueries indexes tables",
+    "Coding": "python coding programming write a function algorithm data structures pandas numpy complexity",
+}
+TOPIC_NAMES: List[str] = list(TOPICS)
+
+# After this many turns in a row where a topic's question was retrieved but not
+# asked, the tracker moves on so the interview doesn't stall on that topic
+MAX_UNASKED_OFFERS = int(os.getenv("MAX_UNASKED_OFFERS", "2"))
+
+def topic_centroids(embeddings, refine_with=None, iterations: int = 2) -> np.ndarray:
+    """
+    Returns a (n_topics, dim) matrix of unit centroids in TOPIC_NAMES order.
+
+    Centroids start at the embedded topic descriptions. If the corpus vectors are
+    passed in refine_with, they are moved to the mean of their members for a few
+    nearest-centroid iterations so they fit the actual question bank.
+    """
+    centroids = np.asarray(embeddings.embed_documents([TOPICS[name] for name in TOPIC_NAMES]), dtype=np.float32)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+
+    if refine_with is not None:
+        vectors = np.asarray(refine_with, dtype=np.float32)
+        for _ in range(iterations):
+            labels = np.argmax(vectors @ centroids.T, axis=1)
+            for t in range(len(TOPIC_NAMES)):
+                members = vectors[labels == t]
+                # Keep the seed centroid for topics that got no members
+                if len(members):
+                    mean = members.mean(axis=0)
+                    centroids[t] = mean / (np.linalg.norm(mean) + 1e-12)
+    return centroids
+
+def assign_topics(vectors, centroids: np.ndarray) -> List[str]:
+    scores = np.asarray(vectors, dtype=np.float32) @ centroids.T
+    return [TOPIC_NAMES[i] for i in np.argmax(scores, axis=1)]
+
+class CoverageTracker:
+    """
+    Per-session record of which topics have already been asked about, so that
+    retrieval always targets the least covered topic next.
+
+    A topic whose question keeps being offered but never asked (the interviewer
+    paraphrased it beyond recognition or went its own way) is counted as covered
+    after MAX_UNASKED_OFFERS turns, otherwise it would stay the least covered topic forever.
+    """
+    def __init__(self, topics: List[str] = None, max_unasked: int = MAX_UNASKED_OFFERS):
+        self.counts = {name: 0 for name in (topics or TOPIC_NAMES)}
+        self.unasked = {name: 0 for name in self.counts}
+        self.max_unasked = max(1, max_unasked)
+
+    def next_topic(self) -> str:
+        # min() keeps declaration order among ties, so topics are visited in order.
+        # Among equally covered topics, the one offered fewer times without being asked goes first
+        return min(self.counts, key=lambda name: (self.counts[name], self.unasked[name]))
+
+    def mark_covered(self, topic: str):
+        if topic in self.counts:
+            self.counts[topic] += 1
+            self.unasked[topic] = 0
+
+    def mark_offered(self, topic: str):
+        """
+        Records a turn where the topic was retrieved but its question was not asked.
+        """
+        if topic not in self.counts:
+            return
+        self.unasked[topic] += 1
+        if self.unasked[topic] >= self.max_unasked:
+            self.mark_covered(topic)
+
+    def uncovered(self) -> List[str]:
+        return [name for name, count in self.counts.items() if count == 0]
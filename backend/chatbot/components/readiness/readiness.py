@@ -0,0 +1,128 @@
+import os, time, threading, importlib
+from typing import Dict
+
+from chatbot.components.src_logging.logger import logging
+
+# Heavy modules the first interview would otherwise pay for, in the order they are warmed.
+# The LLM client needs langchain_huggingface (and with it transformers) either way.
+HEAVY_MODULES = [
+    "numpy",
+    "pyarrow",
+    "langchain_core.messages",
+    "pinecone",
+    "langchain_huggingface",
+    "transformers",
+]
+# Only the configured query encoder's stack is warmed, the ONNX one exists to avoid torch
+ENCODER_MODULES = {
+    "huggingface": ["torch", "sentence_transformers"],
+    "onnx": ["onnxruntime", "tokenizers"],
+}
+# Failed checks are retried with exponential backoff until they pass
+WARM_UP_RETRY_DELAY = float(os.getenv("WARM_UP_RETRY_DELAY", "5"))
+WARM_UP_MAX_RETRY_DELAY = float(os.getenv("WARM_UP_MAX_RETRY_DELAY", "60"))
+
+class Readiness:
+    """
+    Tracks background warm-up of the expensive dependencies. The service is live as
+    soon as the app is imported, but only ready once the embedding model, the
+    question bank / vector store and the LLM client are all usable.
+    """
+    CHECKS = ("embedding_model", "vector_store", "llm_client")
+
+    def __init__(self):
+        self.checks: Dict[str, Dict] = {name: {"ready": False, "detail": "pending"} for name in self.CHECKS}
+        self.import_times: Dict[str, float] = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return all(check["ready"] for check in self.checks.values())
+
+    def _set(self, name, ready, detail, seconds):
+        with self._lock:
+            attempts = self.checks[name].get("attempts", 0) + 1
+            self.checks[name] = {"ready": ready, "detail": detail, "seconds": round(seconds, 3), "attempts": attempts}
+
+    def _run_check(self, name, fn):
+        start = time.perf_counter()
+        try:
+            detail = fn()
+            self._set(name, True, detail or "ok", time.perf_counter() - start)
+        except Exception as e:
+            logging.error(f"Warm-up check '{name}' failed: {e}")
+            self._set(name, False, f"error: {e}", time.perf_counter() - start)
+
+    def measure_imports(self, encoder_backend: str):
+        """
+        Imports HEAVY_MODULES and the encoder's modules one by one and records the
+        incremental cost of each, so the breakdown shows where container cold start time goes.
+        """
+        for module in HEAVY_MODULES + ENCODER_MODULES[encoder_backend]:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                continue  # optional backends (torch / onnxruntime) may not be installed
+            self.import_times[module] = round(time.perf_counter() - start, 3)
+        logging.info(f"Import time breakdown (s): {self.import_times}")
+
+    def warm_up(self):
+        from chatbot.components.rag_implementation.encoder import get_query_encoder, QUERY_ENCODER, \
+            ONNX_MODEL_DIR, _onnx_verified
+        from chatbot.components.rag_implementation.snapshot import snapshot_manager
+        from chatbot.components.llm.llm_client import build_chat_model
+        from chatbot.components.rag_implementation.rag_engine import warm_query_vectors
+
+        # get_query_encoder falls back to the HuggingFace encoder without a verified ONNX export
+        onnx = QUERY_ENCODER == "onnx" and _onnx_verified(ONNX_MODEL_DIR)
+        self.measure_imports("onnx" if onnx else "huggingface")
+
+        def embedding_model():
+            queries = warm_query_vectors(get_query_encoder())
+            return f"{QUERY_ENCODER} encoder loaded, {queries} topic queries cached"
+
+        def vector_store():
+            snapshot = snapshot_manager.load_latest()
+            if snapshot is not None:
+                return f"snapshot {snapshot.version} ({len(snapshot)} questions)"
+            from pinecone import Pinecone
+            stats = Pinecone(api_key=os.getenv("PINECONE_API_KEY")).Index(os.getenv("INDEX_NAME")).describe_index_stats()
+            return f"remote index reachable ({stats.total_vector_count} vectors)"
+
+        def llm_client():
+            if not os.getenv("HUGGINGFACE_HUB_ACCESS_KEY"):
+                raise RuntimeError("HUGGINGFACE_HUB_ACCESS_KEY is not set")
+            build_chat_model()
+            return "client constructed"
+
+        checks = {"embedding_model": embedding_model, "vector_store": vector_store, "llm_client": llm_client}
+        for name, fn in checks.items():
+            self._run_check(name, fn)
+
+        # A transient failure at boot (Pinecone or HF unreachable) mustn't leave the
+        # container unhealthy for good, keep retrying what failed
+        delay = WARM_UP_RETRY_DELAY
+        while not self.ready:
+            failed = [name for name, check in self.checks.items() if not check["ready"]]
+            logging.warning(f"Warm-up checks {failed} failed, retrying in {delay:.0f}s")
+            time.sleep(delay)
+            for name in failed:
+                self._run_check(name, checks[name])
+            delay = min(delay * 2, WARM_UP_MAX_RETRY_DELAY)
+        logging.info(f"Warm-up finished in {time.time() - self.started_at:.1f}s, ready={self.ready}")
+
+    def start_background_warm_up(self):
+        threading.Thread(target=self.warm_up, name="warm-up", daemon=True).start()
+
+    def report(self) -> Dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "checks": dict(self.checks),
+                "import_times_s": dict(self.import_times),
+            }
+
+readiness = Readiness()
@@ -0,0 +1,112 @@
+import io, os, sys, hashlib, threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Optional, Tuple
+
+from chatbot.components.exception.exception import ChatbotException
+from chatbot.components.src_logging.logger import logging
+
+MAX_RESUME_BYTES = int(os.getenv("MAX_RESUME_BYTES", str(5 * 1024 * 1024)))
+MAX_RESUME_PAGES = int(os.getenv("MAX_RESUME_PAGES", "20"))
+# Documents with at least this many pages are split across worker processes
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("RESUME_PARALLEL_PAGES", "6"))
+RESUME_CACHE_SIZE = int(os.getenv("RESUME_CACHE_SIZE", "256"))
+
+class InvalidResume(ValueError):
+    """Raised for uploads that are too large, have too many pages or aren't readable PDFs."""
+
+def _extract_pages(data: bytes, start: int, end: int) -> str:
+    # Runs in a worker process, pypdf is pure Python so threads wouldn't run in parallel
+    from pypdf import PdfReader
+    reader = PdfReader(io.BytesIO(data))
+    return "".join(reader.pages[i].extract_text() or "" for i in range(start, end))
+
+class ResumeParser:
+    """
+    Parses uploaded PDF resumes in memory (no temp files) and caches the extracted
+    text by the SHA-256 of the file, so re-uploading the same resume is instant and
+    /start only needs the hash.
+
+    Long documents are split across a pool of spawned (not forked, the server is
+    multi-threaded) worker processes, created once at startup.
+    """
+    def __init__(self, cache_size: int = RESUME_CACHE_SIZE, workers: int = min(4, os.cpu_count() or 1)):
+        self.cache_size = cache_size
+        self.workers = workers
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self._pool = None
+
+    def start(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+            return self._pool
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def get(self, content_hash: str) -> Optional[str]:
+        with self._lock:
+            text = self._cache.get(content_hash)
+            if text is not None:
+                self._cache.move_to_end(content_hash)
+            return text
+
+    def _put(self, content_hash: str, text: str):
+        with self._lock:
+            self._cache[content_hash] = text
+            self._cache.move_to_end(content_hash)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def parse(self, data: bytes) -> Tuple[str, str, bool]:
+        """
+        Returns (content_hash, text, cached).
+        """
+        if len(data) > MAX_RESUME_BYTES:
+            raise InvalidResume(f"Resume is larger than {MAX_RESUME_BYTES // (1024 * 1024)} MB")
+
+        content_hash = hashlib.sha256(data).hexdigest()
+        cached = self.get(content_hash)
+        if cached is not None:
+            return content_hash, cached, True
+
+        try:
+            from pypdf import PdfReader
+        except Exception as e:
+            raise ChatbotException(e, sys)
+
+        try:
+            n_pages = len(PdfReader(io.BytesIO(data)).pages)
+        except Exception as e:
+            raise InvalidResume(f"Not a readable PDF: {e}")
+        if n_pages > MAX_RESUME_PAGES:
+            raise InvalidResume(f"Resume has {n_pages} pages, the limit is {MAX_RESUME_PAGES}")
+
+        try:
+            if n_pages >= PARALLEL_PAGE_THRESHOLD:
+                pool = self.start()
+                step = -(-n_pages // self.workers)
+                chunks = [(start, min(start + step, n_pages)) for start in range(0, n_pages, step)]
+                futures = [pool.submit(_extract_pages, data, start, end) for start, end in chunks]
+                text = "".join(f.result() for f in futures)
+            else:
+                text = _extract_pages(data, 0, n_pages)
+        except BrokenProcessPool as e:
+            raise ChatbotException(e, sys)
+        except Exception as e:
+            # pypdf failing on a page is a problem with the upload, not the server
+            raise InvalidResume(f"Could not extract text from the PDF: {e}")
+
+        self._put(content_hash, text)
+        logging.info(f"Parsed resume {content_hash[:12]} ({n_pages} pages, {len(text)} chars)")
+        return content_hash, text, False
+
+resume_parser = ResumeParser()
@@ -1,16 +1,168 @@
 import logging
-import os
-from datetime import datetime
+import os, json, time, queue, atexit, threading, contextvars
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-LOG_FILE=f"{datetime.now().strftime('%m__%d__%Y__%H__%M__%S')}.log"
+LOG_DIR = os.getenv("LOG_DIR", os.path.join(os.getcwd(), "logs"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Max DEBUG records per second for any one call site, the rest are sampled out
+LOG_DEBUG_RATE = float(os.getenv("LOG_DEBUG_RATE", "5"))
 
-log_path=os.path.join(os.getcwd(), "logs", LOG_FILE)
-os.makedirs(log_path, exist_ok=True)
+os.makedirs(LOG_DIR, exist_ok=True)
+LOG_PATH_FILE = os.path.join(LOG_DIR, "app.log")
 
-LOG_PATH_FILE=os.path.join(log_path, LOG_FILE)
+# Set per request / per interview session, attached to every record logged in that context
+request_id_var = contextvars.ContextVar("request_id", default=None)
+session_id_var = contextvars.ContextVar("session_id", default=None)
 
-logging.basicConfig(
-    filename=LOG_PATH_FILE,
-    format="[%(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-)
\ No newline at end of file
+def bind_context(request_id=None, session_id=None):
+    if request_id is not None:
+        request_id_var.set(request_id)
+    if session_id is not None:
+        session_id_var.set(str(session_id))
+
+class ContextFilter(logging.Filter):
+    """
+    Runs on the calling thread, so it can read the request's context vars before
+    the record is handed to the background writer.
+    """
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        record.session_id = session_id_var.get()
+        return True
+
+class DebugSampler(logging.Filter):
+    """
+    Token bucket per call site for DEBUG records. Higher levels always pass.
+    The number of records dropped since the last one that passed is attached as `sampled_out`.
+    """
+    def __init__(self, rate: float = LOG_DEBUG_RATE):
+        super().__init__()
+        self.rate = rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last, dropped = self._buckets.get(key, (self.rate, now, 0))
+            tokens = min(self.rate, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, dropped + 1)
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
+        record.sampled_out = dropped
+        return True
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "session_id": getattr(record, "session_id", None),
+        }
+        if getattr(record, "sampled_out", 0):
+            payload["sampled_out"] = record.sampled_out
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Never blocks the request thread: if the writer falls behind and the queue is
+    full, the record is counted and dropped.
+    """
+    dropped = 0
+
+    def prepare(self, record):
+        # Cheaper than the default, which formats and copies every record on the caller's thread.
+        # Only the message and traceback are resolved here, formatting happens on the writer thread.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        # SimpleQueue is unbounded (and much cheaper than queue.Queue), so bound it here
+        if self.queue.qsize() >= LOG_QUEUE_SIZE:
+            DroppingQueueHandler.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+class BatchingRotatingFileHandler(RotatingFileHandler):
+    """
+    Writes everything the listener has drained in one go and flushes once per
+    batch instead of once per record.
+    """
+    def handle_batch(self, records):
+        self.acquire()
+        try:
+            for record in records:
+                if self.shouldRollover(record):
+                    self.doRollover()
+                self.stream.write(self.format(record) + self.terminator)
+            self.stream.flush()
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+class BatchingQueueListener(QueueListener):
+    MAX_BATCH = 512
+
+    def stop(self):
+        # Safe to call twice (explicitly and from atexit)
+        if self._thread is not None:
+            super().stop()
+
+    def _monitor(self):
+        q = self.queue
+        while True:
+            record = q.get()
+            if record is self._sentinel:
+                break
+            batch = [record]
+            stop = False
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    record = q.get_nowait()
+                except queue.Empty:
+                    break
+                if record is self._sentinel:
+                    stop = True
+                    break
+                batch.append(record)
+            for handler in self.handlers:
+                handler.handle_batch(batch)
+            if stop:
+                break
+
+file_handler = BatchingRotatingFileHandler(
+    LOG_PATH_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+)
+file_handler.setFormatter(JsonFormatter())
+
+queue_handler = DroppingQueueHandler(queue.SimpleQueue())
+queue_handler.addFilter(ContextFilter())
+queue_handler.addFilter(DebugSampler())
+
+logging.basicConfig(level=LOG_LEVEL, handlers=[queue_handler])
+
+# File I/O happens on the listener's thread, never on the request thread
+listener = BatchingQueueListener(queue_handler.queue, file_handler)
+listener.start()
+atexit.register(listener.stop)
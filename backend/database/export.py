@@ -0,0 +1,201 @@
+import io, csv, sys, json, base64, argparse
+from datetime import datetime, date, timedelta
+from typing import Iterator, Optional
+
+from chatbot.components.exception.exception import ChatbotException
+from chatbot.components.src_logging.logger import logging
+from database import models
+from database.database import session_local
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+DEFAULT_CHUNK_SIZE = 500
+BASE_COLUMNS = ["id", "username", "job_role", "score", "verdict", "created_at"]
+TEXT_COLUMNS = ["feedback_summary", "resume_text", "transcript"]
+
+def encode_cursor(interview_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"after_id": interview_id}).encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> int:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["after_id"])
+    except Exception:
+        raise ValueError("Invalid cursor token")
+
+def _transcripts(db, interview_ids) -> dict:
+    # Turns of one chunk of interviews in a single query
+    turns = db.query(models.InterviewTurn.interview_id, models.InterviewTurn.turn, models.InterviewTurn.speaker,
+                     models.InterviewTurn.content, models.InterviewTurn.answer_score) \
+        .filter(models.InterviewTurn.interview_id.in_(interview_ids)).order_by(models.InterviewTurn.id).all()
+    transcripts = {}
+    for interview_id, turn, speaker, content, answer_score in turns:
+        transcripts.setdefault(interview_id, []).append(
+            {"turn": turn, "speaker": speaker, "content": content, "answer_score": answer_score}
+        )
+    return transcripts
+
+def iter_chunks(since: Optional[date] = None, until: Optional[date] = None, role: Optional[str] = None,
+                username: Optional[str] = None, include_text: bool = False, cursor: Optional[str] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[list]:
+    """
+    Yields interviews as lists of dicts, `chunk_size` rows at a time, in id order.
+
+    Each chunk is its own keyset query (id > last id seen), so memory stays flat
+    however large the table is and no read transaction is held open while the
+    consumer is slow. Every row carries a `cursor` token that resumes right after it.
+    """
+    after_id = decode_cursor(cursor) if cursor else 0
+    columns = [models.Interview.id, models.User.username, models.Interview.job_role, models.Interview.score,
+               models.Interview.verdict, models.Interview.created_at]
+    if include_text:
+        columns += [models.Interview.feedback_summary, models.Interview.resume_text]
+    # The transcript column is filled per chunk from interview_turns
+    names = BASE_COLUMNS + (["feedback_summary", "resume_text"] if include_text else [])
+
+    db = session_local()
+    try:
+        while True:
+            query = db.query(*columns).join(models.User, models.Interview.user_id == models.User.id) \
+                .filter(models.Interview.id > after_id)
+            if since:
+                query = query.filter(models.Interview.created_at >= datetime.combine(since, datetime.min.time()))
+            if until:
+                # Inclusive of the whole `until` day
+                query = query.filter(models.Interview.created_at < datetime.combine(until + timedelta(days=1), datetime.min.time()))
+            if role:
+                query = query.filter(models.Interview.job_role == role)
+            if username:
+                query = query.filter(models.User.username == username)
+
+            rows = query.order_by(models.Interview.id).limit(chunk_size).all()
+            db.expunge_all()
+            if not rows:
+                return
+            transcripts = _transcripts(db, [row[0] for row in rows]) if include_text else {}
+            chunk = []
+            for row in rows:
+                record = dict(zip(names, row))
+                if include_text:
+                    record["transcript"] = transcripts.get(record["id"], [])
+                record["cursor"] = encode_cursor(record["id"])
+                chunk.append(record)
+            yield chunk
+            after_id = rows[-1][0]
+    except Exception as e:
+        raise ChatbotException(e, sys)
+    finally:
+        db.close()
+
+def _ndjson(chunks):
+    for chunk in chunks:
+        yield "".join(json.dumps(record, default=str) + "\n" for record in chunk).encode("utf-8")
+
+def _flatten_transcripts(chunk):
+    # Flat formats get the transcript as a JSON string
+    return [{**r, "transcript": json.dumps(r["transcript"])} if "transcript" in r else r for r in chunk]
+
+def _csv(chunks, include_text):
+    fieldnames = BASE_COLUMNS + (TEXT_COLUMNS if include_text else []) + ["cursor"]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    for chunk in chunks:
+        writer.writerows(_flatten_transcripts(chunk))
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+class _ChunkSink:
+    """
+    Write-only file object for the parquet writer. Written bytes are collected
+    until drained, while tell() keeps counting so the footer offsets stay right.
+    """
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+def _parquet(chunks, include_text):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fields = [("id", pa.int64()), ("username", pa.string()), ("job_role", pa.string()), ("score", pa.float64()),
+              ("verdict", pa.string()), ("created_at", pa.timestamp("us"))]
+    if include_text:
+        fields += [(name, pa.string()) for name in TEXT_COLUMNS]
+    schema = pa.schema(fields + [("cursor", pa.string())])
+
+    sink = _ChunkSink()
+    # One row group per chunk, flushed to the client as soon as it is written
+    with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pylist(_flatten_transcripts(chunk), schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+def stream_export(fmt: str = "ndjson", include_text: bool = False, **filters) -> Iterator[bytes]:
+    """
+    Encodes the filtered interviews chunk by chunk in the requested format.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}")
+    if filters.get("cursor"):
+        decode_cursor(filters["cursor"])  # fail before streaming starts
+
+    chunks = iter_chunks(include_text=include_text, **filters)
+    if fmt == "ndjson":
+        return _ndjson(chunks)
+    if fmt == "csv":
+        return _csv(chunks, include_text)
+    return _parquet(chunks, include_text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream interviews to a file")
+    parser.add_argument("output", help="file to write, - for stdout")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("--since", type=date.fromisoformat, help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--until", type=date.fromisoformat, help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--role")
+    parser.add_argument("--username")
+    parser.add_argument("--include-text", action="store_true", help="also export transcripts, feedback and resume text")
+    parser.add_argument("--cursor", help="resume after the row that carried this cursor token")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    written = 0
+    try:
+        for data in stream_export(args.format, include_text=args.include_text, since=args.since, until=args.until,
+                                  role=args.role, username=args.username, cursor=args.cursor,
+                                  chunk_size=args.chunk_size):
+            out.write(data)
+            written += len(data)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    logging.info(f"Exported interviews as {args.format}, {written} bytes")
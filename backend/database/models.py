@@ -1,5 +1,5 @@
 # backend/models.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Date, Float
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -28,4 +28,47 @@ class Interview(Base):
     verdict = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    owner = relationship("User", back_populates="interviews")
\ No newline at end of file
+    owner = relationship("User", back_populates="interviews")
+
+class InterviewTurn(Base):
+    __tablename__ = "interview_turns"
+
+    # Appended as the interview happens (see turn_writer.py), ordered by id within an interview
+    id = Column(Integer, primary_key=True)
+    interview_id = Column(Integer, ForeignKey("interviews.id"), index=True, nullable=False)
+    turn = Column(Integer, nullable=False)
+    speaker = Column(String, nullable=False)  # candidate, interviewer or code_runner
+    content = Column(Text, nullable=False)
+    answer_score = Column(Float, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# Rollups over scored interviews, kept up to date by /feedback (see rollups.py)
+
+class ScoreHistogram(Base):
+    __tablename__ = "score_histogram"
+
+    # One row per role and integer score 0-100, job_role "*" covers every role
+    job_role = Column(String, primary_key=True)
+    score = Column(Integer, primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+
+class DailyOutcome(Base):
+    __tablename__ = "daily_outcomes"
+
+    day = Column(Date, primary_key=True)
+    job_role = Column(String, primary_key=True)
+    interviews = Column(Integer, default=0, nullable=False)
+    passed = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Float, default=0, nullable=False)
+
+class UserScoreTrend(Base):
+    __tablename__ = "user_score_trends"
+
+    # Running sums for a least squares fit of score (y) over interview date in days (x)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    interviews = Column(Integer, default=0, nullable=False)
+    passed = Column(Integer, default=0, nullable=False)
+    sum_x = Column(Float, default=0, nullable=False)
+    sum_y = Column(Float, default=0, nullable=False)
+    sum_xx = Column(Float, default=0, nullable=False)
+    sum_xy = Column(Float, default=0, nullable=False)
@@ -0,0 +1,197 @@
+import re, sys, argparse
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from chatbot.components.exception.exception import ChatbotException
+from chatbot.components.src_logging.logger import logging
+from database import models
+from database.database import session_local, engine
+
+ALL_ROLES = "*"
+UNKNOWN_ROLE = "unknown"
+# Origin of the trend's x axis, keeps the running sums of x and x^2 small
+TREND_EPOCH = datetime(2024, 1, 1)
+PERCENTILES = (25, 50, 75, 90)
+
+PASS_VERDICTS = {"pass", "passed", "select", "selected", "hire", "hired"}
+
+def is_pass(verdict) -> bool:
+    # Whole verdict only, a substring test would count "Not Selected" as a pass
+    verdict = re.sub(r"[^a-z]+", " ", str(verdict or "").lower()).strip()
+    return verdict in PASS_VERDICTS
+
+def score_value(score):
+    """
+    A judge score as an int 0-100, None if it isn't a number. The judge's JSON may
+    carry the score as a string ("75") or as a placeholder ("N/A").
+    """
+    try:
+        return min(100, max(0, int(round(float(score)))))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def _contributions(user_id, job_role, score, verdict, created_at, sign=1):
+    """
+    What one scored interview adds to (sign=1) or removes from (sign=-1) each rollup,
+    as (model, key columns, increments). Nothing for a score that isn't a number.
+    """
+    score = score_value(score)
+    if score is None:
+        return
+    role = job_role or UNKNOWN_ROLE
+    passed = sign if is_pass(verdict) else 0
+    x = (created_at - TREND_EPOCH).total_seconds() / 86400
+
+    for r in (role, ALL_ROLES):
+        yield models.ScoreHistogram, {"job_role": r, "score": score}, {"count": sign}
+    yield models.DailyOutcome, {"day": created_at.date(), "job_role": role}, \
+        {"interviews": sign, "passed": passed, "score_sum": sign * score}
+    yield models.UserScoreTrend, {"user_id": user_id}, {
+        "interviews": sign, "passed": passed,
+        "sum_x": sign * x, "sum_y": sign * score, "sum_xx": sign * x * x, "sum_xy": sign * x * score
+    }
+
+def _increment(db: Session, model, keys, increments):
+    # Single statement, so concurrent /feedback calls can't lose each other's updates
+    table = model.__table__
+    stmt = insert(table).values(**keys, **increments)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={col: table.c[col] + value for col, value in increments.items()}
+    )
+    db.execute(stmt)
+
+def record_outcome(db: Session, interview, previous_score=None, previous_verdict=None):
+    """
+    Folds a newly judged interview into the rollups, in the caller's transaction.
+    If the interview had been judged before, its previous result is taken out first.
+    """
+    if previous_score is not None:
+        for model, keys, increments in _contributions(interview.user_id, interview.job_role, previous_score,
+                                                      previous_verdict, interview.created_at, sign=-1):
+            _increment(db, model, keys, increments)
+    if interview.score is not None:
+        for model, keys, increments in _contributions(interview.user_id, interview.job_role, interview.score,
+                                                      interview.verdict, interview.created_at):
+            _increment(db, model, keys, increments)
+
+def score_summary(db: Session, job_role: str = None, bucket_width: int = 10) -> dict:
+    """
+    Count, mean, percentiles and histogram of scores, read from at most 101 histogram rows.
+    """
+    rows = db.query(models.ScoreHistogram.score, models.ScoreHistogram.count).filter(
+        models.ScoreHistogram.job_role == (job_role or ALL_ROLES),
+        models.ScoreHistogram.count > 0
+    ).order_by(models.ScoreHistogram.score).all()
+
+    total = sum(count for _, count in rows)
+    summary = {"job_role": job_role or ALL_ROLES, "count": total, "mean": None,
+               "percentiles": {}, "histogram": []}
+    if not total:
+        return summary
+
+    summary["mean"] = round(sum(score * count for score, count in rows) / total, 2)
+    # Nearest rank percentiles over the cumulative counts
+    cumulative = 0
+    pending = list(PERCENTILES)
+    for score, count in rows:
+        cumulative += count
+        while pending and cumulative >= pending[0] / 100 * total:
+            summary["percentiles"][f"p{pending.pop(0)}"] = score
+
+    buckets = defaultdict(int)
+    for score, count in rows:
+        buckets[score // bucket_width * bucket_width] += count
+    summary["histogram"] = [
+        {"from": start, "to": min(start + bucket_width - 1, 100), "count": buckets.get(start, 0)}
+        for start in range(0, 101, bucket_width)
+    ]
+    return summary
+
+def pass_rate_series(db: Session, job_role: str = None, days: int = 30) -> list:
+    """
+    Interviews, pass rate and mean score per day over the last `days` days.
+    """
+    since = (datetime.utcnow() - timedelta(days=days)).date()
+    query = db.query(
+        models.DailyOutcome.day,
+        func.sum(models.DailyOutcome.interviews),
+        func.sum(models.DailyOutcome.passed),
+        func.sum(models.DailyOutcome.score_sum)
+    ).filter(models.DailyOutcome.day >= since)
+    if job_role:
+        query = query.filter(models.DailyOutcome.job_role == job_role)
+
+    series = []
+    for day, interviews, passed, score_sum in query.group_by(models.DailyOutcome.day).order_by(models.DailyOutcome.day):
+        if not interviews:
+            continue
+        series.append({
+            "day": day.isoformat(),
+            "interviews": interviews,
+            "pass_rate": round(passed / interviews, 3),
+            "mean_score": round(score_sum / interviews, 2)
+        })
+    return series
+
+def user_trend(db: Session, user_id: int) -> dict:
+    trend = db.query(models.UserScoreTrend).filter(models.UserScoreTrend.user_id == user_id).first()
+    if trend is None or not trend.interviews:
+        return {"interviews": 0, "pass_rate": None, "mean_score": None, "points_per_week": None}
+
+    n = trend.interviews
+    denominator = n * trend.sum_xx - trend.sum_x ** 2
+    # Least squares slope of score over time, undefined until interviews span more than one moment
+    slope = (n * trend.sum_xy - trend.sum_x * trend.sum_y) / denominator if n > 1 and abs(denominator) > 1e-9 else None
+    return {
+        "interviews": n,
+        "pass_rate": round(trend.passed / n, 3),
+        "mean_score": round(trend.sum_y / n, 2),
+        "points_per_week": round(slope * 7, 2) if slope is not None else None
+    }
+
+def backfill(db: Session, batch_size: int = 1000) -> int:
+    """
+    Rebuilds every rollup from the scored interviews. Only the small columns are read,
+    never the resume or feedback text.
+    """
+    try:
+        totals = defaultdict(lambda: defaultdict(int))
+        scanned = 0
+        rows = db.query(
+            models.Interview.user_id, models.Interview.job_role, models.Interview.score,
+            models.Interview.verdict, models.Interview.created_at
+        ).filter(models.Interview.score.isnot(None)).yield_per(batch_size)
+        for row in rows:
+            for model, keys, increments in _contributions(*row):
+                key = (model, tuple(sorted(keys.items())))
+                for col, value in increments.items():
+                    totals[key][col] += value
+            scanned += 1
+
+        for model in (models.ScoreHistogram, models.DailyOutcome, models.UserScoreTrend):
+            db.query(model).delete()
+        for (model, keys), increments in totals.items():
+            db.add(model(**dict(keys), **increments))
+        db.commit()
+        logging.info(f"Rebuilt analytics rollups from {scanned} scored interviews")
+        return scanned
+    except Exception as e:
+        db.rollback()
+        raise ChatbotException(e, sys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the analytics rollups from the interviews table")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=engine)
+    db = session_local()
+    try:
+        print(f"Rebuilt rollups from {backfill(db, args.batch_size)} scored interviews")
+    finally:
+        db.close()
@@ -0,0 +1,97 @@
+import os, queue, atexit, threading
+from datetime import datetime
+
+from chatbot.components.src_logging.logger import logging
+from database import models
+from database.database import session_local
+
+TURN_WRITER_BATCH = int(os.getenv("TURN_WRITER_BATCH", "200"))
+# Longest a turn waits in memory before it is written
+TURN_WRITER_INTERVAL = float(os.getenv("TURN_WRITER_INTERVAL", "1.0"))
+
+class TurnWriter:
+    """
+    Appends interview turns to the interview_turns table from a background thread.
+
+    The request thread only enqueues. The writer inserts whatever has queued up in
+    one executemany per batch, at least every TURN_WRITER_INTERVAL seconds, so a
+    crash loses at most that much of a transcript. A failed batch is logged and
+    retried with the next one.
+    """
+    def __init__(self, batch_size: int = TURN_WRITER_BATCH, interval: float = TURN_WRITER_INTERVAL):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue = queue.SimpleQueue()
+        self._pending = []
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._flushed = threading.Condition()
+        self.enqueued = 0
+        self.written = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="turn-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def append(self, interview_id: int, turn: int, speaker: str, content: str, answer_score=None):
+        if self._thread is None:
+            self.start()
+        with self._flushed:
+            self.enqueued += 1
+        self._queue.put({
+            "interview_id": interview_id, "turn": turn, "speaker": speaker, "content": content,
+            "answer_score": answer_score, "created_at": datetime.utcnow()
+        })
+
+    def _write(self):
+        if not self._pending:
+            return
+        db = session_local()
+        try:
+            db.execute(models.InterviewTurn.__table__.insert(), self._pending)
+            db.commit()
+            with self._flushed:
+                self.written += len(self._pending)
+            self._pending = []
+        except Exception as e:
+            db.rollback()
+            logging.error(f"Writing {len(self._pending)} interview turns failed, will retry: {e}")
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stopping.is_set() or not self._queue.empty():
+            try:
+                self._pending.append(self._queue.get(timeout=self.interval))
+                while len(self._pending) < self.batch_size:
+                    self._pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            self._write()
+            with self._flushed:
+                self._flushed.notify_all()
+        self._write()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Waits until every turn queued so far has been written.
+        """
+        if self._thread is None:
+            return True
+        with self._flushed:
+            target = self.enqueued
+            return self._flushed.wait_for(lambda: self.written >= target, timeout=timeout)
+
+    def close(self):
+        with self._lock:
+            if self._thread is not None:
+                self._stopping.set()
+                self._thread.join(timeout=10)
+                self._thread = None
+
+turn_writer = TurnWriter()
@@ -0,0 +1,64 @@
+import os, sys
+from datetime import date
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import Optional
+
+from chatbot.components.exception.exception import ChatbotException
+from chatbot.components.src_logging.logger import logging
+from chatbot.components.rag_implementation.snapshot import snapshot_manager
+from database.export import stream_export, EXPORT_FORMATS, DEFAULT_CHUNK_SIZE
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+# Admin endpoints are disabled unless ADMIN_TOKEN is set
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected or x_admin_token != expected:
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+# Data Validation
+class SnapshotSwapRequest(BaseModel):
+    version: Optional[str] = None  # None swaps to LATEST
+
+# Endpoints
+@router.get("/snapshot", dependencies=[Depends(require_admin)])
+async def get_snapshot():
+    current = snapshot_manager.current()
+    return {
+        "current": current.version if current else None,
+        "questions": len(current) if current else 0,
+        "latest": snapshot_manager.latest_version(),
+        "available": snapshot_manager.available_versions()
+    }
+
+@router.post("/snapshot/swap", dependencies=[Depends(require_admin)])
+async def swap_snapshot(request: SnapshotSwapRequest):
+    try:
+        snapshot = snapshot_manager.swap(request.version)
+        logging.info(f"Admin swapped question bank to {snapshot.version}")
+        return {"message": "Snapshot swapped", "version": snapshot.version, "questions": len(snapshot)}
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise ChatbotException(e, sys)
+
+@router.get("/export", dependencies=[Depends(require_admin)])
+def export_interviews(format: str = "ndjson", since: Optional[date] = None, until: Optional[date] = None,
+                      role: Optional[str] = None, username: Optional[str] = None, include_text: bool = False,
+                      cursor: Optional[str] = None, chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=5000)):
+    """
+    Streams interviews chunk by chunk, memory use doesn't grow with the table.
+    Pass the `cursor` of the last row received to resume an interrupted export.
+    """
+    try:
+        body = stream_export(format, include_text=include_text, since=since, until=until, role=role,
+                             username=username, cursor=cursor, chunk_size=chunk_size)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    logging.info(f"Admin export started: format={format} role={role} user={username} since={since} until={until}")
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[format], headers={
+        "Content-Disposition": f'attachment; filename="interviews.{format}"'
+    })
@@ -0,0 +1,40 @@
+import sys
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from chatbot.components.exception.exception import ChatbotException
+from database import models, rollups
+from database.database import get_db
+from routes.admin_routes import require_admin
+
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"], dependencies=[Depends(require_admin)])
+
+# Endpoints, all served from the rollup tables, never by scanning interviews
+
+@router.get("/scores")
+async def score_distribution(role: Optional[str] = None, bucket_width: int = Query(10, ge=1, le=100),
+                             db: Session = Depends(get_db)):
+    try:
+        return rollups.score_summary(db, role, bucket_width)
+    except Exception as e:
+        raise ChatbotException(e, sys)
+
+@router.get("/pass-rate")
+async def pass_rate(role: Optional[str] = None, days: int = Query(30, ge=1, le=3650), db: Session = Depends(get_db)):
+    try:
+        return {"job_role": role or rollups.ALL_ROLES, "days": days, "series": rollups.pass_rate_series(db, role, days)}
+    except Exception as e:
+        raise ChatbotException(e, sys)
+
+@router.get("/users/{username}/trend")
+async def score_trend(username: str, db: Session = Depends(get_db)):
+    try:
+        user = db.query(models.User.id).filter(models.User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return {"username": username, **rollups.user_trend(db, user.id)}
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise ChatbotException(e, sys)
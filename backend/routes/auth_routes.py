@@ -130,7 +130,7 @@ async def get_profile(username: str, db: Session = Depends(get_db)):
     except Exception as e:
         raise ChatbotException(e, sys)
 
-@router.get("/profile/role")
+@router.put("/profile/role")
 async def update_role(request: UpdateRoleRequest, db: Session = Depends(get_db)):
     user = db.query(models.User).filter(models.User.username == request.username).first()
 
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import sys, os
 from chatbot.components.bot_flow.bot_logic import InterviewLoop
+from chatbot.components.bot_flow.turn_coordinator import turn_coordinator
 from chatbot.components.judge.judge_logic import InterviewJudge
+from chatbot.components.llm.scheduler import llm_scheduler, AdmissionRejected
+from chatbot.components.code_runner.code_runner import code_runner, InvalidSubmission
+from chatbot.components.resume.resume_parser import resume_parser, InvalidResume, MAX_RESUME_BYTES
 from chatbot.components.exception.exception import ChatbotException
-from chatbot.components.src_logging.logger import logging
-from database import models
+from chatbot.components.src_logging.logger import logging, bind_context
+from database import models, rollups
+from database.turn_writer import turn_writer
 from database.database import get_db
 
 router = APIRouter(prefix="/api/interview", tags=["interview"])
@@ -19,39 +25,104 @@ class StartRequest(BaseModel):
     username: str
     role: str
     resume_text: Optional[str] = None
+    resume_hash: Optional[str] = None  # from /resume, preferred over sending the text
 
 class ChatRequest(BaseModel):
     username: str
     message: str
+    request_id: Optional[str] = None  # idempotency key, resubmits with the same id share one turn
 
 class FeedbackRequest(BaseModel):
     username: str
 
+class TestCase(BaseModel):
+    args: List[Any] = []
+    expected: Any
+
+class CodeRequest(BaseModel):
+    username: str
+    code: str
+    problem_id: Optional[str] = None  # registered problem, see GET /code/problems
+    function: Optional[str] = None    # with `tests`, for questions that are not registered
+    tests: Optional[List[TestCase]] = None
+
+def overloaded(e: AdmissionRejected):
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+def run_turn(session, message):
+    """
+    One /chat turn, runs once even when duplicate submits are coalesced.
+    Both sides of the turn are queued for the transcript table.
+    """
+    bot = session["bot"]
+    reply = bot.process_turn(message)
+    turn_writer.append(session["interview_id"], bot.turns, "candidate", message, bot.last_answer_score)
+    turn_writer.append(session["interview_id"], bot.turns, "interviewer", reply)
+    return reply, bot.last_answer_score
+
 # Endpoints
 
+@router.post("/resume")
+async def upload_resume(file: UploadFile = File(...)):
+    """
+    Parses a PDF resume in memory and caches the text by content hash.
+    The returned resume_hash is passed to /start instead of the full text.
+    """
+    if file.content_type not in ("application/pdf", "application/octet-stream"):
+        raise HTTPException(status_code=415, detail="Resume must be a PDF")
+
+    # Read one byte past the limit so oversized uploads are rejected without reading them fully
+    data = await file.read(MAX_RESUME_BYTES + 1)
+    try:
+        content_hash, text, cached = await run_in_threadpool(resume_parser.parse, data)
+    except InvalidResume as e:
+        status = 413 if len(data) > MAX_RESUME_BYTES else 422
+        raise HTTPException(status_code=status, detail=str(e))
+
+    return {
+        "resume_hash": content_hash,
+        "cached": cached,
+        "chars": len(text),
+        "preview": text[:300]
+    }
+
 @router.post("/start")
 async def start_interview(request: StartRequest, db: Session = Depends(get_db)):
-    bot = InterviewLoop(request.role, request.resume_text)
-    
     user = db.query(models.User).filter(models.User.username == request.username).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    resume_text = request.resume_text
+    if not resume_text and request.resume_hash:
+        resume_text = resume_parser.get(request.resume_hash)
+        if resume_text is None:
+            raise HTTPException(status_code=410, detail="Uploaded resume expired, please upload it again")
+
     # NEW: Update User's default resume if a new one is provided
-    if request.resume_text:
-        user.resume_text = request.resume_text
+    if resume_text:
+        user.resume_text = resume_text
         db.commit() # Save to User table
 
+    resume_text = resume_text or user.resume_text # Use saved if current is empty
+    # Builds the RAG engine and embeds the resume, keep that off the event loop
+    bot = await run_in_threadpool(InterviewLoop, request.role, resume_text)
+
     # Create DB Record
     new_interview = models.Interview(
         user_id=user.id,
         job_role=request.role,
-        resume_text=request.resume_text or user.resume_text # Use saved if current is empty
+        resume_text=resume_text
     )
     db.add(new_interview)
     db.commit()
     db.refresh(new_interview)
+    bind_context(session_id=new_interview.id)
 
+    # A new interview replaces one the user abandoned without /feedback,
+    # drop that one's lock and remembered turns or they stay around for good
+    previous = ACTIVE_SESSIONS.get(request.username)
+    if previous is not None:
+        turn_coordinator.forget(previous["interview_id"])
     ACTIVE_SESSIONS[request.username] = {
         "bot": bot,
         "interview_id": new_interview.id 
@@ -66,15 +137,59 @@ async def chat_turn(request: ChatRequest):
             raise HTTPException(status_code=404, detail="Session expired.")
         
         session = ACTIVE_SESSIONS[request.username]
-        bot = session["bot"]
-        ai_response = bot.process_turn(request.message)
+        bind_context(session_id=session["interview_id"])
+        # Turns of a session run one at a time, duplicate submits await the in-flight turn
+        ai_response, answer_score = await turn_coordinator.run(
+            session["interview_id"], request.message, request.request_id,
+            lambda: run_turn(session, request.message)
+        )
 
         return {
             "reply": ai_response,
+            "answer_score": answer_score,  # similarity of this reply to the reference answer, None if not scored
             "is_finished": "INTERVIEW_FINISHED" in ai_response or "Interview Finished" in ai_response or "Verdict:" in ai_response
         }
+    except AdmissionRejected as e:
+        raise overloaded(e)
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise ChatbotException(e, sys)
+
+@router.get("/code/problems")
+async def code_problems():
+    return code_runner.list_problems()
+
+@router.post("/code")
+async def run_code(request: CodeRequest):
+    """
+    Runs the candidate's code in the sandbox and attaches the result to the session.
+    """
+    try:
+        if request.username not in ACTIVE_SESSIONS:
+            raise HTTPException(status_code=404, detail="Session expired.")
+        session = ACTIVE_SESSIONS[request.username]
+        bind_context(session_id=session["interview_id"])
+
+        cases = [t.model_dump() for t in request.tests] if request.tests else None
+        try:
+            result = await run_in_threadpool(code_runner.run, request.code, request.problem_id, request.function, cases)
+        except InvalidSubmission as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+        async with turn_coordinator.session_lock(session["interview_id"]):
+            bot = session["bot"]
+            result["summary"] = bot.record_code_result(request.problem_id or request.function or "code", result)
+            turn_writer.append(session["interview_id"], bot.turns, "code_runner", result["summary"])
+        return result
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise ChatbotException(e, sys)
+
+@router.get("/metrics")
+async def chat_metrics():
+    return {"chat": dict(turn_coordinator.metrics), "llm": llm_scheduler.report()}
     
 @router.post("/feedback")
 async def get_feedback(request: FeedbackRequest, db: Session = Depends(get_db)):
@@ -85,20 +200,38 @@ async def get_feedback(request: FeedbackRequest, db: Session = Depends(get_db)):
         session_data = ACTIVE_SESSIONS[request.username]
         bot = session_data["bot"]
         interview_db_id = session_data["interview_id"]
+        bind_context(session_id=interview_db_id)
 
-        # Judge
-        transcript = bot.get_transcript_str()
+        # Judge, once any in-flight turn has landed in the history
+        async with turn_coordinator.session_lock(interview_db_id):
+            transcript = bot.get_transcript_str(condense_scored=True)
+            answer_scores = bot.answer_scorer.table()
         judge = InterviewJudge()
-        report = judge.evaluate_interview(transcript)
+        report = await run_in_threadpool(judge.evaluate_interview, transcript, answer_scores)
 
         # save to db
         interview_record = db.query(models.Interview).filter(models.Interview.id == interview_db_id).first()
         if interview_record:
+            previous_score, previous_verdict = interview_record.score, interview_record.verdict
             interview_record.score = report.get("score", 0)
             interview_record.verdict = report.get("verdict", "N/A")
             interview_record.feedback_summary = report.get("summary", "")
+
+            # Score and rollups go out in one commit. Rollups are derived data, so a failure
+            # there only rolls back to the savepoint and mustn't lose the score
+            try:
+                with db.begin_nested():
+                    rollups.record_outcome(db, interview_record, previous_score, previous_verdict)
+            except Exception as e:
+                logging.error(f"Updating analytics rollups for interview {interview_db_id} failed, "
+                              f"rebuild them with `python -m database.rollups`: {e}")
             db.commit()
+        turn_coordinator.forget(interview_db_id)
         
         return report
+    except AdmissionRejected as e:
+        raise overloaded(e)
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise ChatbotException(e, sys)
\ No newline at end of file
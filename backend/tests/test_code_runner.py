@@ -0,0 +1,102 @@
+import os, sys, json, subprocess
+import pytest
+
+from chatbot.components.code_runner.code_runner import CodeRunner, SANDBOX_PATH
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="the sandbox needs Linux")
+
+ESCAPES = """
+import os
+def attempt(fn):
+    try:
+        fn()
+        return "allowed"
+    except BaseException as e:
+        return type(e).__name__
+print("environ", attempt(lambda: open(f"/proc/{os.getppid()}/environ", "rb").read()))
+print("socket", attempt(lambda: __import__("socket").socket()))
+print("fork", attempt(os.fork))
+print("kill", attempt(lambda: os.kill(os.getppid(), 0)))
+"""
+
+@pytest.fixture
+def runner():
+    runner = CodeRunner(workers=1)
+    yield runner
+    runner.close()
+
+def test_submission_cannot_reach_environ_network_or_processes(runner, monkeypatch):
+    monkeypatch.setenv("SANDBOX_TEST_SECRET", "do-not-leak")
+    result = runner.run(ESCAPES)
+
+    assert result["status"] == "ok"
+    assert "do-not-leak" not in result["stdout"]
+    outcomes = dict(line.split() for line in result["stdout"].splitlines())
+    assert outcomes == {"environ": "PermissionError", "socket": "ModuleNotFoundError",
+                        "fork": "PermissionError", "kill": "PermissionError"}
+
+def test_syscall_filter_denies_modules_loaded_before_lock_down():
+    # socket is imported before locking down, so the syscall itself has to fail
+    script = f"""
+import os, sys, socket
+sys.path.insert(0, {os.path.dirname(SANDBOX_PATH)!r})
+import sandbox
+sandbox.lock_down(2, 256, *([65534, 65534] if os.geteuid() == 0 else []))
+results = {{}}
+for name, fn in [("socket", socket.socket), ("fork", os.fork), ("environ", lambda: open("/proc/1/environ"))]:
+    try:
+        fn()
+        results[name] = "allowed"
+    except PermissionError:
+        results[name] = "denied"
+print(results)
+"""
+    out = subprocess.run([sys.executable, "-I", "-c", script], capture_output=True, text=True, timeout=30)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == str({"socket": "denied", "fork": "denied", "environ": "denied"})
+
+def test_correct_solution_still_passes(runner):
+    result = runner.run("def add(a, b):\n    return a + b", function="add",
+                        cases=[{"args": [1, 2], "expected": 3}, {"args": [-1, 1], "expected": 0}])
+    assert result["status"] == "ok"
+    assert result["passed"] == 2
+
+WRONG_ADD = "def add(a, b):\n    return 0\n"
+ADD_CASES = [{"args": [1, 2], "expected": 3}, {"args": [-1, 5], "expected": 4}]
+
+def test_patching_the_grader_in_the_worker_does_not_pass_cases(runner):
+    code = WRONG_ADD + (
+        "import sys\n"
+        "for module in (sys.modules['__main__'], sys.modules.get('sandbox')):\n"
+        "    if module is not None:\n"
+        "        module._same = lambda output, expected: True\n"
+        "        module._encode_output = lambda output: {'value': 3, 'repr': '3', 'error': None}\n"
+    )
+    result = runner.run(code, function="add", cases=ADD_CASES)
+
+    assert result["passed"] < 2
+
+def test_forged_report_on_the_result_fd_is_not_trusted(runner):
+    forged = json.dumps({"status": "ok", "error": None, "passed": 2, "total": 2, "stdout": "", "ms": 1,
+                         "cases": [{"passed": True}] * 2, "outputs": [{"value": 3, "repr": "3", "error": None}] * 2})
+    code = WRONG_ADD + (
+        "import os\n"
+        "for fd in range(3, 10):\n"
+        "    try:\n"
+        f"        os.write(fd, {forged.encode()!r})\n"
+        "    except OSError:\n"
+        "        pass\n"
+        "os._exit(0)\n"
+    )
+    result = runner.run(code, function="add", cases=ADD_CASES)
+
+    # The worker never saw the expected values, whatever it claims is graded here
+    assert result["passed"] < 2
+    assert result["total"] == 2
+
+def test_oversized_report_is_rejected(runner):
+    code = "import os\nwhile True:\n    os.write(3, b'x' * 65536)\n"
+    result = runner.run(code)
+
+    assert result["status"] in ("error", "timeout")
+    assert result["passed"] == 0
@@ -0,0 +1,28 @@
+from chatbot.components.rag_implementation.topics import CoverageTracker, TOPIC_NAMES
+
+def test_asked_questions_rotate_through_topics():
+    coverage = CoverageTracker()
+    visited = []
+    for _ in TOPIC_NAMES:
+        topic = coverage.next_topic()
+        visited.append(topic)
+        coverage.mark_covered(topic)
+    assert visited == TOPIC_NAMES
+
+def test_interviewer_that_never_asks_does_not_stall_on_one_topic():
+    coverage = CoverageTracker(max_unasked=2)
+    visited = []
+    for _ in range(2 * len(TOPIC_NAMES)):
+        topic = coverage.next_topic()
+        visited.append(topic)
+        coverage.mark_offered(topic)
+    assert set(visited) == set(TOPIC_NAMES)
+    assert coverage.uncovered() == []
+
+def test_asking_resets_the_unasked_streak():
+    coverage = CoverageTracker(["SQL", "Coding"], max_unasked=2)
+    coverage.mark_offered("SQL")
+    coverage.mark_covered("SQL")
+    coverage.mark_offered("SQL")
+    assert coverage.counts["SQL"] == 1
+    assert coverage.next_topic() == "Coding"
@@ -0,0 +1,17 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+from database.rollups import is_pass
+
+@pytest.mark.parametrize("verdict, passed", [
+    ("Pass", True),
+    ("Selected", True),
+    (" pass. ", True),
+    ("Fail", False),
+    ("Not Selected", False),
+    ("Rejected", False),
+    ("N/A", False),
+    (None, False),
+])
+def test_is_pass_matches_whole_verdicts(verdict, passed):
+    assert is_pass(verdict) is passed
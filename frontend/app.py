@@ -1,8 +1,9 @@
 import streamlit as st
 import requests
-import sys, time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import sys, time, uuid
 from streamlit_ace import st_ace
-from langchain_community.document_loaders import PyPDFLoader
 import os
 
 # --- CONFIGURATION ---
@@ -21,26 +22,85 @@ BASE_URL = os.getenv("API_URL", "http://127.0.0.1:8000")
 API_AUTH = f"{BASE_URL}/api/auth"
 API_INTERVIEW = f"{BASE_URL}/api/interview"
 
-# --- HELPER: RESUME PARSER (Client Side) ---
-def parse_resume(upload_file):
+# --- HTTP CLIENT ---
+# (connect, read) timeouts; interview calls wait on the LLM so they get a longer read timeout
+TIMEOUT = (5, 30)
+LLM_TIMEOUT = (5, 180)
+PROFILE_TTL = 60  # seconds
+
+@st.cache_resource
+def get_http():
+    """
+    One pooled keep-alive session for the whole app instead of a new TCP connection per call.
+    Only idempotent methods are retried (urllib3's default), POSTs hit the LLM and are not.
+    """
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+http = get_http()
+
+# --- HELPER: PROFILE CACHE ---
+def get_profile(username):
+    """
+    Profile + history for the logged in user, cached in their session for PROFILE_TTL
+    so Streamlit reruns don't re-fetch it on every widget change.
+    """
+    cached = st.session_state.get("profile_cache")
+    if cached and cached["username"] == username and time.time() - cached["fetched_at"] < PROFILE_TTL:
+        return cached["data"]
+
+    res = http.get(f"{API_AUTH}/profile/{username}", timeout=TIMEOUT)
+    if res.status_code != 200:
+        return None
+    st.session_state.profile_cache = {"username": username, "data": res.json(), "fetched_at": time.time()}
+    return st.session_state.profile_cache["data"]
+
+def invalidate_profile():
+    # Called when the role changes or an interview finishes
+    st.session_state.pop("profile_cache", None)
+
+# --- HELPER: RESUME UPLOAD (Parsed Server Side) ---
+def upload_resume(upload_file, refresh: bool = False):
+    """
+    Sends the PDF to the backend, which parses it in memory and returns a content hash.
+    Only the hash is sent to /start. Hashes are remembered per file so reruns don't re-upload,
+    refresh=True drops the remembered hash (the backend no longer has it) and uploads again.
+    """
+    uploads = st.session_state.setdefault("resume_uploads", {})
+    key = (upload_file.name, upload_file.size)
+    if refresh:
+        uploads.pop(key, None)
+    if key in uploads:
+        return uploads[key]
+
     try:
-        # Save temp
-        temp_path = f"./temp_{upload_file.name}"
-        with open(temp_path, "wb") as f:
-            f.write(upload_file.getbuffer())
-        
-        # Load
-        loader = PyPDFLoader(temp_path)
-        resume = loader.load()
-        text = "".join([line.page_content for line in resume])
-        
-        # Cleanup
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        return text
+        res = http.post(
+            f"{API_INTERVIEW}/resume",
+            files={"file": (upload_file.name, upload_file.getvalue(), "application/pdf")},
+            timeout=TIMEOUT
+        )
+        if res.status_code != 200:
+            st.error(f"Error parsing PDF: {res.json().get('detail', res.text)}")
+            return None
+        uploads[key] = res.json()["resume_hash"]
+        return uploads[key]
     except Exception as e:
         st.error(f"Error parsing PDF: {e}")
-        return ""
+        return None
+
+# --- HELPER: CODE PROBLEMS ---
+@st.cache_data(ttl=600)
+def get_code_problems():
+    # Problems with registered test cases, shared by every user session
+    try:
+        res = http.get(f"{API_INTERVIEW}/code/problems", timeout=TIMEOUT)
+        return res.json() if res.status_code == 200 else []
+    except Exception:
+        return []
 
 # --- STATE MANAGEMENT ---
 if "page" not in st.session_state:
@@ -49,6 +109,18 @@ if "user_data" not in st.session_state:
     st.session_state.user_data = {} 
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "pending_turn" not in st.session_state:
+    st.session_state.pending_turn = None
+
+def turn_request_id(message: str) -> str:
+    # Idempotency key of the turn being sent. Kept until the turn succeeds, so a
+    # double submit, a rerun or a resend after a 429 of the same answer reuses it
+    # and the backend coalesces them into one LLM call.
+    pending = st.session_state.pending_turn
+    if pending is None or pending["message"] != message:
+        pending = {"message": message, "request_id": uuid.uuid4().hex}
+        st.session_state.pending_turn = pending
+    return pending["request_id"]
 
 # ==========================================
 # PAGE 1: AUTHENTICATION (API CONNECTED)
@@ -70,7 +142,7 @@ def show_auth_page():
                         try:
                             # CALL API
                             payload = {"username": user, "password": pw}
-                            res = requests.post(f"{API_AUTH}/login", json=payload)
+                            res = http.post(f"{API_AUTH}/login", json=payload, timeout=TIMEOUT)
                             
                             if res.status_code == 200:
                                 data = res.json()
@@ -100,7 +172,7 @@ def show_auth_page():
                         try:
                             # CALL API
                             payload = {"username": new_user, "password": new_pw, "role": new_role}
-                            res = requests.post(f"{API_AUTH}/register", json=payload)
+                            res = http.post(f"{API_AUTH}/register", json=payload, timeout=TIMEOUT)
                             
                             if res.status_code == 200:
                                 st.success("Account created! Please log in.")
@@ -121,44 +193,56 @@ def show_resume_page():
 
     with col2:
         # --- NEW LOGIC: Check for Saved Resume ---
-        saved_resume = st.session_state.user_data.get("resume_text")
+        saved_resume = st.session_state.user_data.get("resume_text") or st.session_state.user_data.get("resume_uploaded")
         resume_source = "upload" # Default
         
         if saved_resume:
             st.success("✅ Saved resume found!")
             resume_source = st.radio("Resume Option:", ["Use Saved Resume", "Upload New Resume"])
         
-        final_resume_text = None
+        resume_hash = None
+        uploaded_file = None
+        use_saved = False
         
         # Handle Selection
         if resume_source == "Upload New Resume" or not saved_resume:
             uploaded_file = st.file_uploader("Upload Resume (PDF)", type=["pdf"])
             if uploaded_file:
                 with st.spinner("Processing PDF..."):
-                    final_resume_text = parse_resume(uploaded_file)
+                    resume_hash = upload_resume(uploaded_file)
         else:
             st.info("Using your previously saved resume.")
-            final_resume_text = saved_resume
+            use_saved = True
 
         # START BUTTON
         if st.button("Start Interview 🚀", type="primary", use_container_width=True):
-            if not final_resume_text:
+            if not resume_hash and not use_saved:
                 st.warning("Please upload a resume or select the saved one.")
             else:
                 try:
                     # --- FIX: Changed 'user_id' to 'username' to match Pydantic model ---
+                    # The saved resume already lives on the backend, an upload is referenced by its hash
                     payload = {
                         "username": st.session_state.user_data["name"], 
                         "role": st.session_state.user_data["role"],
-                        "resume_text": final_resume_text
+                        "resume_hash": resume_hash
                     }
                     
                     # Call /start endpoint
-                    res = requests.post(f"{API_INTERVIEW}/start", json=payload)
+                    res = http.post(f"{API_INTERVIEW}/start", json=payload, timeout=LLM_TIMEOUT)
+
+                    # 410: the backend restarted or evicted the upload, send the file again and retry once
+                    if res.status_code == 410 and uploaded_file:
+                        with st.spinner("Processing PDF..."):
+                            resume_hash = upload_resume(uploaded_file, refresh=True)
+                        if resume_hash:
+                            payload["resume_hash"] = resume_hash
+                            res = http.post(f"{API_INTERVIEW}/start", json=payload, timeout=LLM_TIMEOUT)
                     
                     if res.status_code == 200:
-                        # Update session with the latest resume used
-                        st.session_state.user_data["resume_text"] = final_resume_text 
+                        # The backend stored the uploaded resume as the user's saved one
+                        if resume_hash:
+                            st.session_state.user_data["resume_uploaded"] = True
                         
                         # Set initial greeting
                         st.session_state.messages = [{
@@ -204,11 +288,13 @@ def show_interview_page():
             try:
                 payload = {
                     "username": st.session_state.user_data["name"], # Ensure this matches backend expectation too
-                    "message": user_input
+                    "message": user_input,
+                    "request_id": turn_request_id(user_input)
                 }
-                res = requests.post(f"{API_INTERVIEW}/chat", json=payload)
+                res = http.post(f"{API_INTERVIEW}/chat", json=payload, timeout=LLM_TIMEOUT)
                 
                 if res.status_code == 200:
+                    st.session_state.pending_turn = None
                     data = res.json()
                     ai_reply = data["reply"]
                     
@@ -220,6 +306,8 @@ def show_interview_page():
                     if data.get("is_finished"):
                         st.session_state.page = "feedback"
                         st.rerun()
+                elif res.status_code == 429:
+                    st.warning(f"The interviewer is busy, please resend your answer in {res.headers.get('Retry-After', 'a few')} seconds.")
                 else:
                     st.error("Server Error")
             except Exception as e:
@@ -227,11 +315,33 @@ def show_interview_page():
 
     # Optional: Coding Editor
     with st.expander("💻 Open Code Editor"):
+        problems = {p["id"]: p for p in get_code_problems()}
+        problem_id = st.selectbox(
+            "Problem", [None] + list(problems),
+            format_func=lambda pid: "Other (run without tests)" if pid is None else problems[pid]["title"]
+        )
+        if problem_id:
+            st.caption(f"{problems[problem_id]['prompt']} Define `{problems[problem_id]['function']}`.")
         code = st_ace(language="python", theme="monokai", height=200)
         if st.button("Submit Code"):
-            formatted_code = f"My Solution:\n```python\n{code}\n```"
-            st.info("Code copied! Paste it in the chat to submit.")
-            st.code(formatted_code)
+            try:
+                payload = {"username": st.session_state.user_data["name"], "code": code, "problem_id": problem_id}
+                res = http.post(f"{API_INTERVIEW}/code", json=payload, timeout=TIMEOUT)
+                if res.status_code == 200:
+                    result = res.json()
+                    # The interviewer and the judge see the result, no need to paste the code
+                    if result["status"] == "ok" and result["passed"] == result["total"]:
+                        st.success(result["summary"])
+                    else:
+                        st.warning(result["summary"])
+                    if result["cases"]:
+                        st.table([{k: c[k] for k in ("args", "expected", "output", "passed")} for c in result["cases"]])
+                    if result["stdout"]:
+                        st.code(result["stdout"])
+                else:
+                    st.error(res.json().get("detail", "Code run failed"))
+            except Exception as e:
+                st.error(f"Connection Failed: {e}")
 
 # ==========================================
 # PAGE 4: FEEDBACK
@@ -243,10 +353,15 @@ def show_feedback_page():
         with st.spinner("Generating detailed feedback report..."):
             try:
                 payload = {"username": st.session_state.user_data["name"]} # Ensure key matches backend
-                res = requests.post(f"{API_INTERVIEW}/feedback", json=payload)
+                res = http.post(f"{API_INTERVIEW}/feedback", json=payload, timeout=LLM_TIMEOUT)
                 
                 if res.status_code == 200:
                     st.session_state.feedback_data = res.json()
+                    # The history now has a new scored interview
+                    invalidate_profile()
+                elif res.status_code == 429:
+                    st.warning(f"The judge is busy, please retry in {res.headers.get('Retry-After', 'a few')} seconds.")
+                    return
                 else:
                     st.error("Failed to fetch feedback.")
                     return
@@ -289,10 +404,8 @@ def show_profile_page():
 
     # 1. Fetch Profile
     try:
-        res = requests.get(f"{API_AUTH}/profile/{username}")
-        if res.status_code == 200:
-            profile = res.json()
-        else:
+        profile = get_profile(username)
+        if profile is None:
             st.error("Failed to load profile")
             return
     except Exception as e:
@@ -318,11 +431,12 @@ def show_profile_page():
                 
                 if st.form_submit_button("Update Role"):
                     try:
-                        upd_res = requests.put(f"{API_AUTH}/profile/role", json={
+                        upd_res = http.put(f"{API_AUTH}/profile/role", json={
                             "username": username,
                             "new_role": new_role
-                        })
+                        }, timeout=TIMEOUT)
                         if upd_res.status_code == 200:
+                            invalidate_profile()
                             st.success("Role updated!")
                             st.session_state.user_data['role'] = new_role
                             time.sleep(1)